@@ -1,11 +1,20 @@
-from fastapi import FastAPI, HTTPException, WebSocket, Depends, BackgroundTasks
+from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect, Depends, BackgroundTasks, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import Optional, Dict, List
+from typing import Callable, Optional, Dict, List
 from contextlib import asynccontextmanager
-import json
+from collections import deque
+from itertools import count
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from types import MappingProxyType
+import orjson
+import msgspec
+import zstandard
 import asyncio
-from datetime import datetime
+import numpy as np
+from datetime import datetime, timezone
 import websockets
 import logging
 import os
@@ -14,6 +23,8 @@ from services.trading_strategy import TradingStrategy
 from services.ai_analysis import AITradingAnalysis
 from services.mexc_websocket import mexc_ws_service
 from services.database_service import DatabaseService
+import struct
+import hashlib
 import time
 
 # Configure logging
@@ -22,33 +33,86 @@ logger = logging.getLogger(__name__)
 
 # We'll initialize the app after defining lifespan function
 
-# Store for active WebSocket connections
-active_connections: List[WebSocket] = []
+# WebSocket clients are registered on the Broadcaster (defined below with the encoders)
+_TICK_STRUCT = struct.Struct('<dd')  # price, timestamp (little-endian float64) for /ws/ticks
 
-# Background task reference
+# Closed 15m klines for the trading strategy, fed by handle_kline_update
+_KLINE_INTERVAL_MS = 15 * 60 * 1000
+_klines_ring = deque(maxlen=200)
+
+# In-flight public REST calls by key, shared by concurrent callers (see _single_flight)
+_inflight: Dict[str, asyncio.Future] = {}
+
+# Short-lived caches for public MEXC lookups as (monotonic time, value); the locks make
+# concurrent requests share a single upstream call
+_SYMBOLS_TTL = 60.0
+_symbols_cache: Optional[tuple] = None
+_symbols_lock = asyncio.Lock()
+_REST_STATUS_TTL = 2.0
+_rest_status_cache: Optional[tuple] = None
+_rest_status_lock = asyncio.Lock()
+
+# Closed klines waiting for the coalescing window to elapse (see _flush_klines)
+_KLINE_COALESCE_WINDOW = 0.05
+_kline_buf: List[dict] = []
+_kline_flush_handle: Optional[asyncio.TimerHandle] = None
+
+# Price samples waiting to be written to the database by _db_flusher
+_price_buf: List[tuple] = []
+
+# Set whenever the WebSocket feed delivers a fresh price
+_tick_event = asyncio.Event()
+
+# Newest ticker payload waiting for the next flush (older ticks are conflated away)
+_latest_ticker: Optional[dict] = None
+
+# Most recent AI analysis as (monotonic time, current price, analysis), shared by the
+# background task and the manual endpoint
+_last_analysis: Optional[tuple] = None
+_analysis_lock = asyncio.Lock()
+
+# Indicator and AI analysis math runs here so it never blocks the event loop
+_cpu_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="indicators")
+
+# 15m klines behind the last AI analysis, refreshed incrementally by _ai_klines
+_ai_klines_cache: Optional[np.ndarray] = None
+_ANALYSIS_TTL = 10.0
+
+# Background task reference, with a stop signal for cooperative exit and a lock that
+# serializes start/stop requests
 ai_analysis_task_ref = None
+_ai_stop_event = asyncio.Event()
+_ai_task_lock = asyncio.Lock()
 
 # Trading state
-trading_state = {
-    "is_trading": False,
-    "api_key": None,
-    "api_secret": None,
-    "initial_balance": None,
-    "current_balance": None,
-    "trades": [],
-    "last_price": None,
-    "mexc_service": None,
-    "trading_strategy": None,
-    "ai_analysis": AITradingAnalysis(),
-    "database_service": DatabaseService(),
-    "auto_analysis_enabled": True,  # Start AI analysis by default
-    "auto_trading_enabled": False  # Auto trading is paused by default
-}
+@dataclass(slots=True)
+class TradingState:
+    is_trading: bool = False
+    api_key: Optional[str] = None
+    api_secret: Optional[str] = None
+    initial_balance: Optional[float] = None
+    current_balance: Optional[float] = None
+    trades: deque = field(default_factory=lambda: deque(maxlen=2000))  # Most recent trades only
+    last_price: Optional[float] = None
+    mexc_service: Optional[MexcService] = None
+    trading_strategy: Optional[TradingStrategy] = None
+    ai_analysis: AITradingAnalysis = field(default_factory=AITradingAnalysis)
+    database_service: DatabaseService = field(default_factory=DatabaseService)
+    public_mexc: MexcService = field(default_factory=lambda: MexcService("", ""))  # Shared client for public market data
+    auto_analysis_enabled: bool = True  # Start AI analysis by default
+    auto_trading_enabled: bool = False  # Auto trading is paused by default
+
+trading_state = TradingState()
 
 # Removed candle aggregation - focusing on real-time WebSocket data
 
 # Removed candle aggregation functions - using real-time WebSocket data instead
 
+def raise_http(message: str, status_code: int = 500):
+    """Log the exception being handled (with traceback) and raise an HTTPException that doesn't expose it"""
+    logger.error(message, exc_info=True)
+    raise HTTPException(status_code=status_code, detail=message)
+
 class TradingCredentials(BaseModel):
     api_key: str
     api_secret: str
@@ -56,33 +120,42 @@ class TradingCredentials(BaseModel):
 # WebSocket callback functions for real-time data
 async def handle_ticker_update(data):
     """Handle ticker updates from WebSocket - Real-time price data for fast trading decisions"""
+    global _latest_ticker
     try:
         if 'c' in data:  # Current price
             price = float(data['c'])
             timestamp = time.time()
             
             # Update global trading state with latest price
-            trading_state["last_price"] = price
+            trading_state.last_price = price
+            _tick_event.set()
             
-            # Broadcast real-time price to connected WebSocket clients
-            broadcast_data = {
-                "type": "price_update",
-                "data": {
-                    "price": price,
-                    "timestamp": timestamp,
-                    "symbol": data.get('s', 'BTCUSDC'),
-                    "volume": data.get('v', 0),
-                    "change": data.get('P', 0),
-                    "high": data.get('h', 0),
-                    "low": data.get('l', 0)
-                }
+            # Keep only the newest tick; _flush_ticker broadcasts it to clients
+            _latest_ticker = {
+                "price": price,
+                "timestamp": timestamp,
+                "symbol": data.get('s', 'BTCUSDC'),
+                "volume": data.get('v', 0),
+                "change": data.get('P', 0),
+                "high": data.get('h', 0),
+                "low": data.get('l', 0)
             }
-            asyncio.create_task(broadcast_to_websockets(broadcast_data))
         else:
             logger.debug(f"Ticker data missing 'c' field: {data}")
     except Exception as e:
         logger.error(f"Error handling ticker update: {e}")
 
+async def _flush_ticker(interval: float = 0.1):
+    """Broadcast the newest buffered ticker to connected clients at a fixed cadence"""
+    global _latest_ticker
+    while True:
+        await asyncio.sleep(interval)
+        ticker, _latest_ticker = _latest_ticker, None
+        if ticker:
+            broadcaster.publish({"type": "price_update", "data": ticker})
+            if broadcaster.has_subscribers("ticks"):
+                broadcaster.publish_frame(_TICK_STRUCT.pack(ticker["price"], ticker["timestamp"]), "ticks")
+
 async def handle_trade_update(data):
     """Handle trade updates from WebSocket - Immediate trade execution data"""
     try:
@@ -92,7 +165,8 @@ async def handle_trade_update(data):
             timestamp = time.time()
             
             # Update global trading state with latest trade price
-            trading_state["last_price"] = price
+            trading_state.last_price = price
+            _tick_event.set()
             
             # Broadcast real-time trade data to connected WebSocket clients
             broadcast_data = {
@@ -105,57 +179,247 @@ async def handle_trade_update(data):
                     "side": data.get('m', False)  # True = buyer is market maker
                 }
             }
-            asyncio.create_task(broadcast_to_websockets(broadcast_data))
+            broadcaster.publish(broadcast_data)
     except Exception as e:
         logger.error(f"Error handling trade update: {e}")
 
-async def broadcast_to_websockets(data):
-    """Broadcast data to all connected WebSocket clients"""
-    if active_connections:
-        for connection in active_connections:
+def _encode(data) -> str:
+    """Serialize a broadcast payload once for all clients"""
+    return orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+
+def _json_array_stream(items, head: bytes = b'[', tail: bytes = b']'):
+    """Yield a JSON array one encoded item at a time"""
+    yield head
+    for i, item in enumerate(items):
+        yield (b',' if i else b'') + orjson.dumps(item, option=orjson.OPT_SERIALIZE_NUMPY)
+    yield tail
+
+def _msgpack_default(obj):
+    """Convert NumPy values the MessagePack encoder cannot handle natively"""
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    raise NotImplementedError(f"Cannot encode {type(obj).__name__}")
+
+_msgpack_encoder = msgspec.msgpack.Encoder(enc_hook=_msgpack_default)
+
+_zstd_compressor = zstandard.ZstdCompressor(level=3)
+_ZSTD_MIN_SIZE = 256  # Smaller frames aren't worth compressing
+
+def _zstd_frame(frame: bytes) -> bytes:
+    """Prefix a MessagePack frame with a 1-byte flag (1 = zstd-compressed, 0 = raw)"""
+    if len(frame) >= _ZSTD_MIN_SIZE:
+        return b'\x01' + _zstd_compressor.compress(frame)
+    return b'\x00' + frame
+
+class Broadcaster:
+    """Fan-out of market data to WebSocket clients: one bounded queue and writer task per client,
+    every payload encoded once per wire format"""
+
+    # Wire formats: "json" (text), "msgpack", "zstd" (flag-prefixed zstd MessagePack) and "ticks" (raw binary frames)
+    FORMATS = ("json", "msgpack", "zstd", "ticks")
+
+    def __init__(self, queue_size: int = 64):
+        self.queue_size = queue_size
+        self._subs: Dict[str, Dict[WebSocket, asyncio.Queue]] = {fmt: {} for fmt in self.FORMATS}
+        self._writers: Dict[WebSocket, asyncio.Task] = {}
+        # Close code for cancelled writers - 1000 when the client went away, 1001 once the server is shutting down
+        self._close_code = 1000
+
+    def has_subscribers(self, fmt: str) -> bool:
+        return bool(self._subs[fmt])
+
+    def add(self, websocket: WebSocket, fmt: str, send: Callable):
+        """Register a client and start the writer task draining its queue"""
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subs[fmt][websocket] = queue
+        self._writers[websocket] = asyncio.create_task(self._writer(websocket, queue, send))
+
+    def remove(self, websocket: WebSocket):
+        """Forget a client and stop its writer task"""
+        self._forget(websocket)
+        writer = self._writers.pop(websocket, None)
+        if writer:
+            writer.cancel()
+
+    async def close_all(self):
+        """Stop every writer task on shutdown, closing its socket with 1001 (going away), and wait for them"""
+        self._close_code = 1001
+        writers = list(self._writers.values())
+        for writer in writers:
+            writer.cancel()
+        await asyncio.gather(*writers, return_exceptions=True)
+
+    def _forget(self, websocket: WebSocket):
+        for subs in self._subs.values():
+            subs.pop(websocket, None)
+
+    async def _writer(self, websocket: WebSocket, queue: asyncio.Queue, send: Callable):
+        """Drain a client's outbound queue onto its socket"""
+        try:
+            while True:
+                frame = await queue.get()
+                await asyncio.wait_for(send(frame), timeout=2.0)
+        except asyncio.CancelledError:
+            # Writer stopped (client disconnected or server shutting down) - a normal close
             try:
-                await connection.send_json(data)
-            except Exception as e:
-                logger.error(f"Error broadcasting to WebSocket client: {e}")
+                await websocket.close(code=self._close_code)
+            except Exception:
+                pass
+            raise
+        except asyncio.TimeoutError:
+            # Stuck socket that can't keep up - 1013 (try again later) so the client reconnects
+            logger.warning("WebSocket client stuck sending, closing it")
+            try:
+                await asyncio.wait_for(websocket.close(code=1013), timeout=2.0)
+            except Exception:
+                pass
+        except Exception as e:
+            # Dead or stuck socket - prune it and close so the receive loop in _serve_client ends too
+            logger.error(f"Error sending to WebSocket client: {e!r}")
+            try:
+                await asyncio.wait_for(websocket.close(code=1011), timeout=2.0)
+            except Exception:
+                pass
+        finally:
+            self._forget(websocket)
+            self._writers.pop(websocket, None)
+
+    def publish_frame(self, frame, fmt: str):
+        """Queue an encoded frame for every client of one wire format, dropping the oldest frame when a client falls behind"""
+        # Sends run concurrently in each client's writer task, so fan-out never waits on a socket
+        for queue in self._subs[fmt].values():
+            if queue.full():
+                queue.get_nowait()  # Stale market data is worthless - keep the newest frames
+            queue.put_nowait(frame)
+
+    def publish(self, data):
+        """Broadcast a message to all /ws clients, encoding it once per wire format"""
+        subs = self._subs
+        if subs["json"]:
+            self.publish_frame(_encode(data), "json")
+        if subs["msgpack"] or subs["zstd"]:
+            packed = _msgpack_encoder.encode(data)
+            if subs["msgpack"]:
+                self.publish_frame(packed, "msgpack")
+            if subs["zstd"]:
+                # Compressed once for every subscriber instead of a deflate context per socket
+                self.publish_frame(_zstd_frame(packed), "zstd")
+
+broadcaster = Broadcaster()
+
+async def _single_flight(key: str, fn: Callable, *args):
+    """Run a blocking, idempotent call in a worker thread, sharing one in-flight call among concurrent callers"""
+    future = _inflight.get(key)
+    if future is None:
+        future = asyncio.ensure_future(asyncio.to_thread(fn, *args))
+        _inflight[key] = future
+        future.add_done_callback(lambda _: _inflight.pop(key, None))
+    # Shield so a cancelled caller doesn't cancel the call for everyone else
+    return await asyncio.shield(future)
+
+def _public_btc_price():
+    """Current BTC price from the public REST API, coalesced across concurrent callers"""
+    return _single_flight("btc_price", trading_state.public_mexc.get_btc_price)
+
+def _price_symbol(asset: str) -> str:
+    """Symbol an asset is valued against - BTC via BTCUSDC (as get_btc_price), others via <asset>USDT"""
+    return 'BTCUSDC' if asset == 'BTC' else f'{asset}USDT'
+
+async def _asset_prices(assets: List[str]) -> Dict[str, float]:
+    """Prices keyed by symbol for the given assets - one batched request, or concurrent per-symbol requests if that fails"""
+    try:
+        return await _single_flight("all_prices", trading_state.public_mexc.get_all_prices)
+    except Exception as e:
+        logger.warning(f"Batched ticker prices unavailable, pricing assets individually: {e}")
+    symbols = [_price_symbol(asset) for asset in assets if asset != 'USDT']
+    results = await asyncio.gather(
+        *(asyncio.to_thread(trading_state.public_mexc.get_price, symbol) for symbol in symbols),
+        return_exceptions=True
+    )
+    return {symbol: price for symbol, price in zip(symbols, results) if not isinstance(price, Exception)}
+
+def _held_assets(balance: Dict) -> List[str]:
+    """Assets with a non-zero free + locked balance"""
+    return [b['asset'] for b in balance.get('balances', []) if float(b['free']) + float(b['locked']) > 0]
+
+def _usd_value(asset: str, amount: float, prices: Dict[str, float]) -> float:
+    """USD value of an asset amount (USDT at par, 0 if the asset can't be priced)"""
+    if asset == 'USDT':
+        return amount
+    return amount * prices.get(_price_symbol(asset), 0.0)
+
+def _free_map(balance: Dict) -> Dict[str, float]:
+    """Map asset -> free balance in a single pass over the account balances"""
+    return {asset['asset']: float(asset['free']) for asset in balance.get('balances', [])}
+
+async def _strategy_klines(mexc_service: MexcService) -> List:
+    """Closed 15m klines for the strategy, refreshed over REST only when the WebSocket feed falls behind"""
+    now_ms = time.time() * 1000
+    if len(_klines_ring) < 100 or now_ms >= _klines_ring[-1][0] + 2 * _KLINE_INTERVAL_MS:
+        klines = await asyncio.to_thread(mexc_service.get_klines, interval='15m', limit=101)
+        _klines_ring.clear()
+        _klines_ring.extend(kline for kline in klines if kline[6] < now_ms)  # Closed candles only
+    return list(_klines_ring)[-100:]
+
+# REST polling cadence for update_market_data while the WebSocket feed carries prices
+_REST_PRICE_AFTER_MISSED_TICKS = 5  # Seconds without a tick before asking REST for the price
+_BALANCE_REFRESH_INTERVAL = 15.0
+_price_log_counter = count(1)
 
 async def update_market_data():
     """Background task to update market data"""
-    while trading_state["is_trading"]:
+    missed_ticks = 0
+    balance_refresh_at = 0.0
+    usdc_balance = btc_balance = 0.0
+    while trading_state.is_trading:
         try:
-            # Get latest price
-            price = trading_state["mexc_service"].get_btc_price()
-            trading_state["last_price"] = price
+            # One timestamp per iteration, shared by trade records and the broadcast
+            ts_iso = datetime.now().isoformat()
+            
+            # Use the WebSocket-fed price; hit REST only once the feed has been silent for a while
+            try:
+                await asyncio.wait_for(_tick_event.wait(), timeout=1.0)
+                missed_ticks = 0
+            except asyncio.TimeoutError:
+                missed_ticks += 1
+                if trading_state.last_price is None or missed_ticks % _REST_PRICE_AFTER_MISSED_TICKS == 0:
+                    trading_state.last_price = await _public_btc_price()
+            _tick_event.clear()
+            price = trading_state.last_price
 
             # Log price to database (every 10th update to avoid spam)
-            if hasattr(update_market_data, 'price_log_counter'):
-                update_market_data.price_log_counter += 1
-            else:
-                update_market_data.price_log_counter = 1
-            
-            if update_market_data.price_log_counter % 10 == 0:
-                await trading_state["database_service"].log_price(price)
+            if next(_price_log_counter) % 10 == 0:
+                _price_buf.append((datetime.now(timezone.utc), price))
 
             # Get klines for technical analysis (using 15m for consistency with AI analysis)
-            klines = trading_state["mexc_service"].get_klines(interval='15m', limit=100)
-            indicators = trading_state["trading_strategy"].calculate_indicators(klines)
+            klines = await _strategy_klines(trading_state.mexc_service)
+            indicators = await asyncio.get_running_loop().run_in_executor(
+                _cpu_pool, trading_state.trading_strategy.calculate_indicators, klines
+            )
 
             # Check if we should trade (only if auto trading is enabled)
-            should_trade, action, confidence = trading_state["trading_strategy"].should_trade()
+            should_trade, action, confidence = trading_state.trading_strategy.should_trade()
             
             # Debug logging for technical indicators
-            if trading_state["auto_trading_enabled"]:
+            if trading_state.auto_trading_enabled:
                 logger.info(f"Technical Indicators (15m) - Action: {action}, Confidence: {confidence:.2f}, Should Trade: {should_trade}")
                 logger.info(f"DEBUG: Using klines data length: {len(klines)}, timeframe: 15m")
 
-            if should_trade and trading_state["auto_trading_enabled"]:
+            # Balances only change when we trade - refresh periodically, and always right before an order
+            now = time.monotonic()
+            if (should_trade and trading_state.auto_trading_enabled) or now >= balance_refresh_at:
+                balance = await asyncio.to_thread(trading_state.mexc_service.get_account_balance)
+                free = _free_map(balance)
+                usdc_balance = free.get('USDC', 0.0)
+                btc_balance = free.get('BTC', 0.0)
+                balance_refresh_at = now + _BALANCE_REFRESH_INTERVAL
+
+            if should_trade and trading_state.auto_trading_enabled:
                 logger.info(f"🚀 ATTEMPTING TO EXECUTE TRADE: {action} at price {price}")
                 
                 try:
-                    # Get current balance
-                    balance = trading_state["mexc_service"].get_account_balance()
-                    usdc_balance = float(next((asset['free'] for asset in balance['balances'] if asset['asset'] == 'USDC'), 0))
-                    btc_balance = float(next((asset['free'] for asset in balance['balances'] if asset['asset'] == 'BTC'), 0))
-                    
                     logger.info(f"💰 Current Balance - USDC: {usdc_balance}, BTC: {btc_balance}")
 
                     if action == 'BUY' and usdc_balance > 0:
@@ -170,14 +434,16 @@ async def update_market_data():
                         logger.info(f"📊 BUY Order Details - USDC Amount: ${usdc_amount}, Price: {price}, Expected BTC: {usdc_amount/price:.6f}")
                         
                         # Use MARKET order with quoteOrderQty (USDC amount)
-                        order = trading_state["mexc_service"].place_order('BUY', quantity=0, order_type='MARKET', quote_qty=usdc_amount)
+                        order = await asyncio.to_thread(
+                            trading_state.mexc_service.place_order, 'BUY', quantity=0, order_type='MARKET', quote_qty=usdc_amount
+                        )
                         logger.info(f"✅ BUY ORDER PLACED: {order}")
                         
                         # Calculate the actual BTC quantity received
                         btc_quantity = usdc_amount / price
                         
                         # Log trade to database
-                        await trading_state["database_service"].log_trade(
+                        await trading_state.database_service.log_trade(
                             action="BUY",
                             price=price,
                             quantity=btc_quantity,
@@ -187,13 +453,14 @@ async def update_market_data():
                             metadata={"confidence": confidence, "indicators": indicators}
                         )
                         
-                        trading_state["trades"].append({
+                        trading_state.trades.append({
                             "type": "BUY",
                             "price": price,
                             "quantity": btc_quantity,
-                            "timestamp": datetime.now().isoformat()
+                            "timestamp": ts_iso
                         })
-                        trading_state["trading_strategy"].update_position('BUY')
+                        trading_state.trading_strategy.update_position('BUY')
+                        balance_refresh_at = 0.0  # Pick up the filled order next iteration
 
                     elif action == 'SELL' and btc_balance > 0:
                         # Round BTC balance to 6 decimal places for MEXC
@@ -207,11 +474,11 @@ async def update_market_data():
                         logger.info(f"📊 SELL Order Details - Original: {btc_balance}, Rounded: {quantity}, Price: {price}, Value: ${quantity * price:.2f}")
                         
                         # Use MARKET order for immediate execution
-                        order = trading_state["mexc_service"].place_order('SELL', quantity, order_type='MARKET')
+                        order = await asyncio.to_thread(trading_state.mexc_service.place_order, 'SELL', quantity, order_type='MARKET')
                         logger.info(f"✅ SELL ORDER PLACED: {order}")
                         
                         # Log trade to database
-                        await trading_state["database_service"].log_trade(
+                        await trading_state.database_service.log_trade(
                             action="SELL",
                             price=price,
                             quantity=quantity,
@@ -221,13 +488,14 @@ async def update_market_data():
                             metadata={"confidence": confidence, "indicators": indicators}
                         )
                         
-                        trading_state["trades"].append({
+                        trading_state.trades.append({
                             "type": "SELL",
                             "price": price,
                             "quantity": quantity,
-                            "timestamp": datetime.now().isoformat()
+                            "timestamp": ts_iso
                         })
-                        trading_state["trading_strategy"].update_position('SELL')
+                        trading_state.trading_strategy.update_position('SELL')
+                        balance_refresh_at = 0.0  # Pick up the filled order next iteration
                     
                     else:
                         logger.warning(f"⚠️ Cannot execute {action} - USDC Balance: {usdc_balance}, BTC Balance: {btc_balance}")
@@ -237,81 +505,131 @@ async def update_market_data():
                     logger.error(f"🔍 Error details: action={action}, price={price}, confidence={confidence}")
 
             # Update current balance
-            balance = trading_state["mexc_service"].get_account_balance()
-            usdc_balance = float(next((asset['free'] for asset in balance['balances'] if asset['asset'] == 'USDC'), 0))
-            btc_balance = float(next((asset['free'] for asset in balance['balances'] if asset['asset'] == 'BTC'), 0))
-            trading_state["current_balance"] = usdc_balance + (btc_balance * price)
+            trading_state.current_balance = usdc_balance + (btc_balance * price)
 
             # Broadcast update to all connected clients
-            for connection in active_connections:
-                try:
-                    await connection.send_json({
-                        "type": "trading_update",
-                        "data": {
-                            "last_price": price,
-                            "current_balance": trading_state["current_balance"],
-                            "initial_balance": trading_state["initial_balance"],
-                            "indicators": indicators,
-                            "timestamp": datetime.now().isoformat()
-                        }
-                    })
-                except Exception as e:
-                    logger.error(f"Error sending update to client: {e}")
+            broadcaster.publish({
+                "type": "trading_update",
+                "data": {
+                    "last_price": price,
+                    "current_balance": trading_state.current_balance,
+                    "initial_balance": trading_state.initial_balance,
+                    "indicators": indicators,
+                    "timestamp": ts_iso
+                }
+            })
 
         except Exception as e:
             logger.error(f"Error in market data update: {e}")
 
         await asyncio.sleep(1)  # Update every second
 
+async def _flush_prices():
+    """Write buffered price samples to the database in one batch"""
+    if _price_buf:
+        rows = _price_buf[:]
+        _price_buf.clear()
+        await trading_state.database_service.log_prices_bulk(rows)
+
+async def _db_flusher(interval: float = 30.0):
+    """Background task flushing buffered price samples"""
+    while True:
+        await asyncio.sleep(interval)
+        await _flush_prices()
+
+async def _ai_klines(mexc_service: MexcService) -> np.ndarray:
+    """200 15m klines for AI analysis - fetched in full once, then only the newest candles are refreshed"""
+    global _ai_klines_cache
+    cache = _ai_klines_cache
+    if cache is None or len(cache) < 200 or time.time() * 1000 >= cache[-1, 0] + 2 * _KLINE_INTERVAL_MS:
+        cache = await asyncio.to_thread(mexc_service.get_klines_array, interval='15m', limit=200)
+    else:
+        recent = await asyncio.to_thread(mexc_service.get_klines_array, interval='15m', limit=3)
+        if len(recent):
+            # Replace the still-forming candle(s) and append any new ones
+            cache = np.concatenate([cache[cache[:, 0] < recent[0, 0]], recent])[-200:]
+    _ai_klines_cache = cache
+    return cache
+
+async def _do_ai_analysis():
+    """Run AI analysis on 15m klines as (current_price, analysis, fresh), reusing (fresh=False) a result younger than _ANALYSIS_TTL seconds"""
+    global _last_analysis
+    async with _analysis_lock:
+        if _last_analysis and time.monotonic() - _last_analysis[0] < _ANALYSIS_TTL:
+            return _last_analysis[1], _last_analysis[2], False
+        
+        # Get 15m klines for analysis (better for swing trading)
+        mexc_service = trading_state.public_mexc  # Public data doesn't need auth
+        klines_15m, current_price = await asyncio.gather(_ai_klines(mexc_service), _public_btc_price())
+        
+        # Perform AI analysis
+        analysis = await asyncio.get_running_loop().run_in_executor(
+            _cpu_pool, trading_state.ai_analysis.analyze_market, klines_15m, current_price
+        )
+        if "error" not in analysis:
+            _last_analysis = (time.monotonic(), current_price, analysis)
+        return current_price, analysis, True
+
+async def _publish_analysis(current_price: float, analysis: dict):
+    """Broadcast a new AI analysis to all connected clients and log it to the database"""
+    broadcaster.publish({
+        "type": "ai_analysis",
+        "data": analysis
+    })
+    
+    ai_decision = analysis.get('ai_decision', {})
+    
+    await trading_state.database_service.log_ai_analysis(
+        current_price=current_price,
+        recommendation=ai_decision.get('action', 'HOLD'),
+        confidence=analysis.get('confidence_score', 0),
+        reasoning='; '.join(ai_decision.get('reasoning', [])),
+        technical_indicators=analysis.get('indicators', {}),
+        metadata=analysis
+    )
+    
+    logger.info(f"AI Analysis: {ai_decision.get('action', 'HOLD')} - Confidence: {analysis.get('confidence_score', 0):.1f}%")
+
 async def ai_analysis_task():
     """Background task for AI analysis every minute"""
-    while trading_state["auto_analysis_enabled"]:
+    while trading_state.auto_analysis_enabled and not _ai_stop_event.is_set():
         try:
-            # Get 15m klines for analysis (better for swing trading)
-            mexc_service = MexcService("", "")  # Public data doesn't need auth
-            klines_15m = mexc_service.get_klines(interval='15m', limit=200)
-            current_price = mexc_service.get_btc_price()
+            current_price, analysis, fresh = await _do_ai_analysis()
             
-            # Perform AI analysis
-            analysis = trading_state["ai_analysis"].analyze_market(klines_15m, current_price)
-            
-            # Log AI analysis to database
-            ai_decision = analysis.get('ai_decision', {})
-            reasoning = ai_decision.get('reasoning', [])
-            # Convert reasoning list to string if needed
-            reasoning_str = '; '.join(reasoning) if isinstance(reasoning, list) else str(reasoning)
-            
-            await trading_state["database_service"].log_ai_analysis(
-                current_price=current_price,
-                recommendation=ai_decision.get('action', 'HOLD'),
-                confidence=analysis.get('confidence_score', 0),
-                reasoning=reasoning_str,
-                technical_indicators=analysis.get('indicators', {}),
-                metadata=analysis
-            )
-            
-            # Broadcast AI analysis to all connected clients
-            for connection in active_connections:
-                try:
-                    await connection.send_json({
-                        "type": "ai_analysis",
-                        "data": analysis
-                    })
-                except Exception as e:
-                    logger.error(f"Error sending AI analysis to client: {e}")
-            
-            logger.info(f"AI Analysis: {analysis.get('ai_decision', {}).get('action', 'HOLD')} - Confidence: {analysis.get('confidence_score', 0):.1f}%")
+            # A result reused from a recent manual analysis was already handed out - don't
+            # broadcast or log it twice
+            if fresh:
+                await _publish_analysis(current_price, analysis)
             
         except Exception as e:
             logger.error(f"Error in AI analysis: {e}")
         
-        await asyncio.sleep(60)  # Analyze every minute
+        # Analyze every minute, waking early when asked to stop
+        try:
+            await asyncio.wait_for(_ai_stop_event.wait(), timeout=60)
+        except asyncio.TimeoutError:
+            pass
+
+def _start_ai_task():
+    """Start the AI analysis loop"""
+    global ai_analysis_task_ref
+    _ai_stop_event.clear()
+    ai_analysis_task_ref = asyncio.create_task(ai_analysis_task())
+
+async def _stop_ai_task():
+    """Signal the AI analysis loop to exit and wait for it, cancelling it if it takes too long"""
+    global ai_analysis_task_ref
+    task, ai_analysis_task_ref = ai_analysis_task_ref, None
+    _ai_stop_event.set()
+    if task and not task.done():
+        try:
+            await asyncio.wait_for(task, timeout=5.0)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            pass
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Modern FastAPI lifespan event handler"""
-    global ai_analysis_task_ref
-    
     # Startup
     logger.info("🚀 Starting Bitcoin Trading Bot...")
     
@@ -326,13 +644,12 @@ async def lifespan(app: FastAPI):
         
         if database_url:
             # Log masked URL for debugging
-            masked_url = database_url[:30] + "..." + database_url[-20:] if len(database_url) > 50 else database_url
-            logger.info(f"🔍 Database URL format: {masked_url}")
+            logger.info(f"🔍 Database URL format: {trading_state.database_service.config.masked_url}")
         
-        db_connected = await trading_state["database_service"].connect()
+        db_connected = await trading_state.database_service.connect()
         if db_connected:
             logger.info("✅ Connected to Railway PostgreSQL database successfully")
-            await trading_state["database_service"].log_system_event(
+            await trading_state.database_service.log_system_event(
                 "INFO", "startup", "Trading bot started successfully"
             )
         else:
@@ -352,6 +669,9 @@ async def lifespan(app: FastAPI):
         # Subscribe to real-time trade updates for immediate price changes
         await mexc_ws_service.subscribe_trade("BTCUSDC", handle_trade_update)
         
+        # Subscribe to closed 15m candles for the trading strategy
+        await mexc_ws_service.subscribe_kline("BTCUSDC", "15m", handle_kline_update)
+        
         if mexc_ws_service.fallback_mode:
             logger.info("MEXC WebSocket in fallback mode - using REST API polling")
             logger.info("Data will be updated every 1-2 seconds instead of real-time")
@@ -362,8 +682,12 @@ async def lifespan(app: FastAPI):
         logger.error(f"Error setting up connections: {e}")
         logger.info("Application will continue with limited functionality")
     
-    if trading_state["auto_analysis_enabled"]:
-        ai_analysis_task_ref = asyncio.create_task(ai_analysis_task())
+    # Conflated ticker broadcasts and batched price logging
+    ticker_flush_task = asyncio.create_task(_flush_ticker())
+    db_flush_task = asyncio.create_task(_db_flusher())
+    
+    if trading_state.auto_analysis_enabled:
+        _start_ai_task()
         logger.info("🤖 AI Analysis started automatically on server startup")
     
     yield  # Application runs here
@@ -371,26 +695,35 @@ async def lifespan(app: FastAPI):
     # Shutdown
     logger.info("🛑 Shutting down Bitcoin Trading Bot...")
     
+    # Stop AI analysis before the database and MEXC clients go away
+    if ai_analysis_task_ref:
+        await _stop_ai_task()
+        logger.info("🤖 AI Analysis task stopped")
+    
     # Log shutdown event
+    db_flush_task.cancel()
     try:
-        await trading_state["database_service"].log_system_event(
+        await _flush_prices()
+        await trading_state.database_service.log_system_event(
             "INFO", "shutdown", "Trading bot shutting down"
         )
-        await trading_state["database_service"].disconnect()
+        await trading_state.database_service.disconnect()
         logger.info("📊 Database connection closed")
     except Exception as e:
         logger.error(f"Error during database shutdown: {e}")
     
+    # Close client sockets and wait for their writer tasks
+    await broadcaster.close_all()
+    
     # Disconnect WebSocket
     await mexc_ws_service.disconnect()
+    ticker_flush_task.cancel()
+    trading_state.public_mexc.close()
+    _cpu_pool.shutdown(wait=False, cancel_futures=True)
     logger.info("🔌 WebSocket connections closed")
-    
-    if ai_analysis_task_ref:
-        ai_analysis_task_ref.cancel()
-        logger.info("🤖 AI Analysis task cancelled")
 
-# Initialize FastAPI app with lifespan
-app = FastAPI(lifespan=lifespan)
+# Initialize FastAPI app with lifespan (orjson for every JSON response)
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 
 # Enable CORS
 app.add_middleware(
@@ -409,7 +742,7 @@ app.add_middleware(
 
 @app.post("/api/start-trading")
 async def start_trading(credentials: TradingCredentials, background_tasks: BackgroundTasks):
-    if trading_state["is_trading"]:
+    if trading_state.is_trading:
         raise HTTPException(status_code=400, detail="Trading is already active")
     
     try:
@@ -419,69 +752,68 @@ async def start_trading(credentials: TradingCredentials, background_tasks: Backg
         
         # Test connection first
         logger.info("🧪 Testing MEXC API connection...")
-        test_price = mexc_service.get_btc_price()
+        test_price = await asyncio.to_thread(mexc_service.get_btc_price)
         logger.info(f"✅ MEXC connection successful. BTC Price: ${test_price}")
         
-        # Get initial balance
+        # Get initial balance (and a fresh price alongside it)
         logger.info("💰 Fetching account balance...")
-        balance = mexc_service.get_account_balance()
+        balance, initial_price = await asyncio.gather(
+            asyncio.to_thread(mexc_service.get_account_balance),
+            asyncio.to_thread(mexc_service.get_btc_price)
+        )
         logger.info(f"📊 Account balance response: {balance}")
         
-        usdc_balance = float(next((asset['free'] for asset in balance['balances'] if asset['asset'] == 'USDC'), 0))
-        btc_balance = float(next((asset['free'] for asset in balance['balances'] if asset['asset'] == 'BTC'), 0))
-        initial_price = mexc_service.get_btc_price()
+        free = _free_map(balance)
+        usdc_balance = free.get('USDC', 0.0)
+        btc_balance = free.get('BTC', 0.0)
         
         logger.info(f"💵 USDC Balance: {usdc_balance}, BTC Balance: {btc_balance}, BTC Price: ${initial_price}")
         
-        trading_state.update({
-            "is_trading": True,
-            "api_key": credentials.api_key,
-            "api_secret": credentials.api_secret,
-            "initial_balance": usdc_balance + (btc_balance * initial_price),
-            "current_balance": usdc_balance + (btc_balance * initial_price),
-            "mexc_service": mexc_service,
-            "trading_strategy": TradingStrategy()
-        })
+        trading_state.is_trading = True
+        trading_state.api_key = credentials.api_key
+        trading_state.api_secret = credentials.api_secret
+        trading_state.initial_balance = usdc_balance + (btc_balance * initial_price)
+        trading_state.current_balance = usdc_balance + (btc_balance * initial_price)
+        trading_state.mexc_service = mexc_service
+        trading_state.trading_strategy = TradingStrategy()
         
         # Start background task for market data updates
         background_tasks.add_task(update_market_data)
         
         return {"status": "Trading started successfully"}
     except Exception as e:
-        logger.error(f"❌ Error starting trading: {e}")
-        logger.error(f"🔍 Error type: {type(e).__name__}")
-        logger.error(f"📍 Error details: API Key length: {len(credentials.api_key)}, Secret length: {len(credentials.api_secret)}")
-        
-        # Provide more specific error messages
+        # Provide more specific error messages (the exception itself is only logged)
         if "400" in str(e):
-            raise HTTPException(status_code=400, detail=f"MEXC API Error: {str(e)} - Check your API credentials")
+            raise_http("MEXC API Error - Check your API credentials", 400)
         elif "401" in str(e) or "403" in str(e):
-            raise HTTPException(status_code=400, detail="Invalid API credentials - Check your MEXC API key and secret")
+            raise_http("Invalid API credentials - Check your MEXC API key and secret", 400)
         elif "timeout" in str(e).lower():
-            raise HTTPException(status_code=500, detail="Connection timeout - Try again in a moment")
+            raise_http("Connection timeout - Try again in a moment")
         else:
-            raise HTTPException(status_code=500, detail=f"Trading start failed: {str(e)}")
+            raise_http("Trading start failed")
 
 @app.post("/api/stop-trading")
 async def stop_trading():
-    if not trading_state["is_trading"]:
+    if not trading_state.is_trading:
         raise HTTPException(status_code=400, detail="Trading is not active")
     
-    trading_state["is_trading"] = False
-    trading_state["api_key"] = None
-    trading_state["api_secret"] = None
-    trading_state["mexc_service"] = None
-    trading_state["trading_strategy"] = None
+    trading_state.is_trading = False
+    trading_state.api_key = None
+    trading_state.api_secret = None
+    if trading_state.mexc_service:
+        trading_state.mexc_service.close()
+    trading_state.mexc_service = None
+    trading_state.trading_strategy = None
     
     return {"status": "Trading stopped successfully"}
 
 @app.get("/api/trading-status")
 async def get_trading_status():
     return {
-        "is_trading": trading_state["is_trading"],
-        "initial_balance": trading_state["initial_balance"],
-        "current_balance": trading_state["current_balance"],
-        "trades": trading_state["trades"]
+        "is_trading": trading_state.is_trading,
+        "initial_balance": trading_state.initial_balance,
+        "current_balance": trading_state.current_balance,
+        "trades": list(trading_state.trades)
     }
 
 @app.get("/api/klines")
@@ -489,20 +821,19 @@ async def get_klines(interval: str = "1m", limit: int = 100):
     """Get BTC/USDC kline data from MEXC API - Real-time WebSocket provides high-frequency price updates"""
     try:
         # Use MEXC API for all intervals (1m, 5m, 15m, etc.)
-        mexc_service = MexcService("", "")
-        klines = mexc_service.get_klines(interval=interval, limit=limit)
+        mexc_service = trading_state.public_mexc
+        klines = await asyncio.to_thread(mexc_service.get_klines, interval=interval, limit=limit)
         
-        # Convert MEXC kline format to lightweight-charts format
+        # Convert MEXC kline format to lightweight-charts format (column-wise casts)
         chart_data = []
-        for kline in klines:
-            chart_data.append({
-                "time": int(kline[0]) / 1000,  # Convert to seconds
-                "open": float(kline[1]),
-                "high": float(kline[2]),
-                "low": float(kline[3]),
-                "close": float(kline[4]),
-                "volume": float(kline[5])
-            })
+        if klines:
+            arr = np.asarray(klines, dtype=object)
+            times = arr[:, 0].astype(np.int64) // 1000  # Convert to seconds
+            ohlcv = arr[:, 1:6].astype(np.float64)
+            chart_data = [
+                {"time": t, "open": o, "high": h, "low": l, "close": c, "volume": v}
+                for t, (o, h, l, c, v) in zip(times.tolist(), ohlcv.tolist())
+            ]
         
         return {
             "success": True,
@@ -511,78 +842,75 @@ async def get_klines(interval: str = "1m", limit: int = 100):
             "source": "mexc_api",
             "note": "Real-time price updates available via WebSocket (~100ms frequency)"
         }
-    except Exception as e:
-        logger.error(f"Error fetching klines: {e}")
+    except Exception:
+        logger.error("Error fetching klines", exc_info=True)
         return {
             "success": False,
-            "error": str(e),
+            "error": "Failed to fetch klines",
             "data": []
         }
 
 @app.get("/api/trading-history")
 async def get_trading_history():
     """Get trading history"""
-    return trading_state["trades"]
+    return list(trading_state.trades)
+
+# Metrics reported when the database can't provide them
+_ZERO_PERF = MappingProxyType({
+    "performance_24h": 0,
+    "performance_1w": 0,
+    "overall_performance": 0,
+    "trades_24h": 0,
+    "trades_1w": 0
+})
 
 @app.get("/api/trading-performance")
 async def get_trading_performance():
     """Get comprehensive trading performance metrics"""
     try:
         # Get trading stats from database
-        db_stats = await trading_state["database_service"].get_trading_stats()
+        db_stats = await trading_state.database_service.get_trading_stats()
         
         # Get real-time total account balance if API credentials are available
-        current_balance = trading_state.get("current_balance", 0)
-        current_price = trading_state.get("last_price", 0)
+        current_balance = trading_state.current_balance
+        current_price = trading_state.last_price
         
         # If trading is active and we have API credentials, fetch real-time balance
-        if (trading_state.get("is_trading", False) and 
-            trading_state.get("api_key") and 
-            trading_state.get("api_secret")):
+        if (trading_state.is_trading and 
+            trading_state.mexc_service):
             try:
-                mexc_service = MexcService(trading_state["api_key"], trading_state["api_secret"])
-                balance = mexc_service.get_account_balance()
+                mexc_service = trading_state.mexc_service  # Reuse the authenticated session from start-trading
+                balance = await asyncio.to_thread(mexc_service.get_account_balance)
+                
+                prices = await _asset_prices(_held_assets(balance))
                 
                 # Calculate total account value (USDT + crypto holdings)
                 total_usd_value = 0
                 for asset_balance in balance.get('balances', []):
                     asset = asset_balance['asset']
-                    free = float(asset_balance['free'])
-                    locked = float(asset_balance['locked'])
-                    total_asset = free + locked
+                    total_asset = float(asset_balance['free']) + float(asset_balance['locked'])
                     
                     if total_asset > 0:
-                        if asset == 'USDT':
-                            total_usd_value += total_asset
-                        else:
-                            try:
-                                if asset == 'BTC':
-                                    btc_price = mexc_service.get_btc_price()
-                                    total_usd_value += total_asset * btc_price
-                                    current_price = btc_price  # Update current price
-                                else:
-                                    price_response = mexc_service._make_request('GET', '/api/v3/ticker/price', {'symbol': f'{asset}USDT'})
-                                    asset_price = float(price_response['price'])
-                                    total_usd_value += total_asset * asset_price
-                            except:
-                                pass  # Skip assets we can't price
+                        total_usd_value += _usd_value(asset, total_asset, prices)  # Assets we can't price count as 0
+                        if asset == 'BTC' and 'BTCUSDC' in prices:
+                            current_price = prices['BTCUSDC']  # Update current price
                 
                 current_balance = total_usd_value
                 # Update the trading state with real-time balance
-                trading_state["current_balance"] = current_balance
-                trading_state["last_price"] = current_price
+                trading_state.current_balance = current_balance
+                trading_state.last_price = current_price
                 
             except Exception as e:
                 logger.warning(f"Could not fetch real-time balance: {e}")
         
         # Calculate performance metrics
         performance_data = {
-            "initial_balance": trading_state.get("initial_balance", 0),
+            "initial_balance": trading_state.initial_balance,
             "current_balance": current_balance,
             "current_price": current_price,
-            "total_trades": len(trading_state.get("trades", [])),
+            "total_trades": len(trading_state.trades),
             "database_stats": db_stats,
-            "trading_started": trading_state.get("is_trading", False)
+            "trading_started": trading_state.is_trading
         }
         
         # Calculate performance percentages
@@ -596,120 +924,87 @@ async def get_trading_performance():
             performance_data["total_return_percent"] = 0
         
         # Get performance metrics from database for different time periods
-        if trading_state["database_service"].pool:
+        if trading_state.database_service.pool:
             try:
-                async with trading_state["database_service"].pool.acquire() as conn:
-                    # Get 24h performance
-                    result_24h = await conn.fetchrow('''
-                        SELECT 
-                            MIN(balance_after) as min_balance_24h,
-                            MAX(balance_after) as max_balance_24h,
-                            COUNT(*) as trades_24h
-                        FROM trading_history 
-                        WHERE timestamp > NOW() - INTERVAL '24 hours'
-                          AND balance_after IS NOT NULL
-                    ''')
-                    
-                    # Get 1 week performance  
-                    result_1w = await conn.fetchrow('''
-                        SELECT 
-                            MIN(balance_after) as min_balance_1w,
-                            MAX(balance_after) as max_balance_1w,
-                            COUNT(*) as trades_1w
-                        FROM trading_history 
-                        WHERE timestamp > NOW() - INTERVAL '1 week'
-                          AND balance_after IS NOT NULL
-                    ''')
-                    
-                    # Get first trade balance for overall calculation
-                    first_trade = await conn.fetchrow('''
-                        SELECT balance_before, timestamp as start_time
-                        FROM trading_history 
-                        WHERE balance_before IS NOT NULL
-                        ORDER BY timestamp ASC 
-                        LIMIT 1
-                    ''')
-                    
-                    # Get latest trade balance
-                    latest_trade = await conn.fetchrow('''
-                        SELECT balance_after, timestamp as latest_time
-                        FROM trading_history 
-                        WHERE balance_after IS NOT NULL
-                        ORDER BY timestamp DESC 
-                        LIMIT 1
-                    ''')
-                    
-                    # Calculate 24h performance
-                    if result_24h and result_24h['min_balance_24h'] is not None and result_24h['max_balance_24h'] is not None and float(result_24h['min_balance_24h']) > 0:
-                        performance_24h = ((float(result_24h['max_balance_24h']) - float(result_24h['min_balance_24h'])) / float(result_24h['min_balance_24h'])) * 100
-                        performance_data["performance_24h"] = round(performance_24h, 2)
-                        performance_data["trades_24h"] = result_24h['trades_24h'] or 0
-                    else:
-                        performance_data["performance_24h"] = 0
-                        performance_data["trades_24h"] = result_24h['trades_24h'] if result_24h else 0
-                    
-                    # Calculate 1 week performance
-                    if result_1w and result_1w['min_balance_1w'] is not None and result_1w['max_balance_1w'] is not None and float(result_1w['min_balance_1w']) > 0:
-                        performance_1w = ((float(result_1w['max_balance_1w']) - float(result_1w['min_balance_1w'])) / float(result_1w['min_balance_1w'])) * 100
-                        performance_data["performance_1w"] = round(performance_1w, 2)
-                        performance_data["trades_1w"] = result_1w['trades_1w'] or 0
-                    else:
-                        performance_data["performance_1w"] = 0
-                        performance_data["trades_1w"] = result_1w['trades_1w'] if result_1w else 0
+                # 24h / 1 week windows plus first and latest trade balances in one round-trip
+                row = await trading_state.database_service.get_performance_snapshot()
+                
+                # Calculate 24h performance
+                if row['min_balance_24h'] is not None and row['max_balance_24h'] is not None and float(row['min_balance_24h']) > 0:
+                    performance_24h = ((float(row['max_balance_24h']) - float(row['min_balance_24h'])) / float(row['min_balance_24h'])) * 100
+                    performance_data["performance_24h"] = round(performance_24h, 2)
+                else:
+                    performance_data["performance_24h"] = 0
+                performance_data["trades_24h"] = row['trades_24h'] or 0
+                
+                # Calculate 1 week performance
+                if row['min_balance_1w'] is not None and row['max_balance_1w'] is not None and float(row['min_balance_1w']) > 0:
+                    performance_1w = ((float(row['max_balance_1w']) - float(row['min_balance_1w'])) / float(row['min_balance_1w'])) * 100
+                    performance_data["performance_1w"] = round(performance_1w, 2)
+                else:
+                    performance_data["performance_1w"] = 0
+                performance_data["trades_1w"] = row['trades_1w'] or 0
+                
+                # Calculate overall performance from first to latest trade
+                if (row['balance_before'] is not None and 
+                    row['balance_after'] is not None and 
+                    float(row['balance_before']) > 0):
+                    overall_performance = ((float(row['balance_after']) - float(row['balance_before'])) / float(row['balance_before'])) * 100
+                    performance_data["overall_performance"] = round(overall_performance, 2)
+                    performance_data["trading_start_time"] = row['start_time']
+                    performance_data["latest_trade_time"] = row['latest_time']
+                else:
+                    performance_data["overall_performance"] = 0
+                    performance_data["trading_start_time"] = None
+                    performance_data["latest_trade_time"] = None
                     
-                    # Calculate overall performance from first to latest trade
-                    if (first_trade and latest_trade and 
-                        first_trade['balance_before'] is not None and 
-                        latest_trade['balance_after'] is not None and 
-                        float(first_trade['balance_before']) > 0):
-                        overall_performance = ((float(latest_trade['balance_after']) - float(first_trade['balance_before'])) / float(first_trade['balance_before'])) * 100
-                        performance_data["overall_performance"] = round(overall_performance, 2)
-                        performance_data["trading_start_time"] = first_trade['start_time'].isoformat()
-                        performance_data["latest_trade_time"] = latest_trade['latest_time'].isoformat()
-                    else:
-                        performance_data["overall_performance"] = 0
-                        performance_data["trading_start_time"] = None
-                        performance_data["latest_trade_time"] = None
-                        
             except Exception as e:
                 logger.error(f"Error fetching performance metrics from database: {e}")
-                performance_data["performance_24h"] = 0
-                performance_data["performance_1w"] = 0
-                performance_data["overall_performance"] = 0
-                performance_data["trades_24h"] = 0
-                performance_data["trades_1w"] = 0
+                performance_data.update(_ZERO_PERF)
         else:
             # No database connection - use basic metrics
-            performance_data["performance_24h"] = 0
-            performance_data["performance_1w"] = 0
+            performance_data.update(_ZERO_PERF)
             performance_data["overall_performance"] = performance_data["total_return_percent"]
-            performance_data["trades_24h"] = 0
-            performance_data["trades_1w"] = 0
         
         return performance_data
         
-    except Exception as e:
-        logger.error(f"Error getting trading performance: {e}")
-        raise HTTPException(status_code=500, detail=f"Failed to get performance metrics: {str(e)}")
+    except Exception:
+        raise_http("Failed to get performance metrics")
+
+# Static settings payload, encoded once at import
+_SETTINGS_BYTES = orjson.dumps({
+    "trading_pair": "BTC/USDT",
+    "timeframe": "1m",
+    "initial_balance": 1000,
+    "max_position_size": 0.1,
+    "stop_loss_percentage": 2,
+    "take_profit_percentage": 4,
+    "enable_indicators": True,
+    "rsi_period": 14,
+    "rsi_overbought": 70,
+    "rsi_oversold": 30,
+    "macd_fast": 12,
+    "macd_slow": 26,
+    "macd_signal": 9,
+})
+_SETTINGS_ETAG = f'"{hashlib.md5(_SETTINGS_BYTES).hexdigest()}"'
+_SETTINGS_HEADERS = {"ETag": _SETTINGS_ETAG, "Cache-Control": "public, max-age=60"}
 
 @app.get("/api/settings")
-async def get_settings():
+async def get_settings(request: Request):
     """Get trading settings"""
-    return {
-        "trading_pair": "BTC/USDT",
-        "timeframe": "1m",
-        "initial_balance": 1000,
-        "max_position_size": 0.1,
-        "stop_loss_percentage": 2,
-        "take_profit_percentage": 4,
-        "enable_indicators": True,
-        "rsi_period": 14,
-        "rsi_overbought": 70,
-        "rsi_oversold": 30,
-        "macd_fast": 12,
-        "macd_slow": 26,
-        "macd_signal": 9,
-    }
+    if request.headers.get("if-none-match") == _SETTINGS_ETAG:
+        return Response(status_code=304, headers=_SETTINGS_HEADERS)
+    return Response(content=_SETTINGS_BYTES, media_type="application/json", headers=_SETTINGS_HEADERS)
+
+def _polled_json(request: Request, payload, extra_headers: Optional[Dict[str, str]] = None) -> Response:
+    """JSON response with a payload-hash ETag and a 1s shared cache, for status endpoints dashboards poll
+    (per-request values such as timestamps go in extra_headers so they don't defeat the ETag)"""
+    body = orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
+    headers = {"ETag": f'"{hashlib.md5(body).hexdigest()}"', "Cache-Control": "public, max-age=1", **(extra_headers or {})}
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 @app.post("/api/settings")
 async def save_settings(settings: dict):
@@ -721,106 +1016,105 @@ async def save_settings(settings: dict):
 @app.post("/api/start-ai-analysis")
 async def start_ai_analysis():
     """Start AI analysis background task"""
-    global ai_analysis_task_ref
-    if trading_state["auto_analysis_enabled"] and ai_analysis_task_ref and not ai_analysis_task_ref.done():
-        raise HTTPException(status_code=400, detail="AI analysis is already running")
-    
-    trading_state["auto_analysis_enabled"] = True
-    ai_analysis_task_ref = asyncio.create_task(ai_analysis_task())
+    async with _ai_task_lock:
+        if trading_state.auto_analysis_enabled and ai_analysis_task_ref and not ai_analysis_task_ref.done():
+            raise HTTPException(status_code=400, detail="AI analysis is already running")
+        
+        # Make sure a previous loop has fully exited before starting a new one
+        await _stop_ai_task()
+        trading_state.auto_analysis_enabled = True
+        _start_ai_task()
     
     return {"status": "AI analysis started"}
 
 @app.post("/api/stop-ai-analysis")
 async def stop_ai_analysis():
     """Stop AI analysis background task"""
-    global ai_analysis_task_ref
-    if not trading_state["auto_analysis_enabled"]:
-        raise HTTPException(status_code=400, detail="AI analysis is not running")
-    
-    trading_state["auto_analysis_enabled"] = False
-    if ai_analysis_task_ref:
-        ai_analysis_task_ref.cancel()
-        ai_analysis_task_ref = None
+    async with _ai_task_lock:
+        if not trading_state.auto_analysis_enabled:
+            raise HTTPException(status_code=400, detail="AI analysis is not running")
+        
+        trading_state.auto_analysis_enabled = False
+        await _stop_ai_task()
     
     return {"status": "AI analysis stopped"}
 
 @app.get("/api/ai-analysis-status")
-async def get_ai_analysis_status():
-    """Get AI analysis status"""
-    return {
-        "is_running": trading_state["auto_analysis_enabled"],
-        "last_analysis": trading_state["ai_analysis"].analysis_history[-1] if trading_state["ai_analysis"].analysis_history else None
-    }
+async def get_ai_analysis_status(request: Request):
+    """Get AI analysis status (new analyses are also pushed to /ws subscribers as "ai_analysis" messages)"""
+    return _polled_json(request, {
+        "is_running": trading_state.auto_analysis_enabled,
+        "last_analysis": trading_state.ai_analysis.analysis_history[-1] if trading_state.ai_analysis.analysis_history else None
+    })
 
 @app.get("/api/ai-analysis-history")
 async def get_ai_analysis_history():
     """Get AI analysis history"""
-    return trading_state["ai_analysis"].get_analysis_history()
+    return StreamingResponse(_json_array_stream(trading_state.ai_analysis.get_analysis_history()),
+                             media_type="application/json")
 
 @app.get("/api/manual-ai-analysis")
 async def manual_ai_analysis():
     """Trigger manual AI analysis"""
     try:
-        mexc_service = MexcService("", "")  # Public data doesn't need auth
-        klines_15m = mexc_service.get_klines(interval='15m', limit=200)
-        current_price = mexc_service.get_btc_price()
-        
-        analysis = trading_state["ai_analysis"].analyze_market(klines_15m, current_price)
+        _, analysis, _ = await _do_ai_analysis()
         return analysis
-    except Exception as e:
-        logger.error(f"Error in manual AI analysis: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    except Exception:
+        raise_http("Manual AI analysis failed")
 
 @app.post("/api/start-auto-trading")
 async def start_auto_trading():
     """Start auto trading"""
-    try:
-        trading_state["auto_trading_enabled"] = True
-        logger.info("Auto trading started")
-        return {"status": "success", "message": "Auto trading started", "auto_trading_enabled": True}
-    except Exception as e:
-        logger.error(f"Error starting auto trading: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    trading_state.auto_trading_enabled = True
+    logger.info("Auto trading started")
+    return {"status": "success", "message": "Auto trading started", "auto_trading_enabled": True}
 
 @app.post("/api/pause-auto-trading")
 async def pause_auto_trading():
     """Pause auto trading"""
-    try:
-        trading_state["auto_trading_enabled"] = False
-        logger.info("Auto trading paused")
-        return {"status": "success", "message": "Auto trading paused", "auto_trading_enabled": False}
-    except Exception as e:
-        logger.error(f"Error pausing auto trading: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    trading_state.auto_trading_enabled = False
+    logger.info("Auto trading paused")
+    return {"status": "success", "message": "Auto trading paused", "auto_trading_enabled": False}
 
 @app.get("/api/auto-trading-status")
-async def get_auto_trading_status():
+async def get_auto_trading_status(request: Request):
     """Get auto trading status"""
-    return {
-        "auto_trading_enabled": trading_state["auto_trading_enabled"],
-        "is_trading": trading_state["is_trading"]
-    }
+    return _polled_json(request, {
+        "auto_trading_enabled": trading_state.auto_trading_enabled,
+        "is_trading": trading_state.is_trading
+    })
 
 @app.post("/api/set-update-frequency")
 async def set_update_frequency(frequency: dict):
     """Set the update frequency for different data streams"""
     try:
-        # Disconnect current streams
-        await mexc_ws_service.disconnect()
-        
-        # Reconnect with new settings
-        await mexc_ws_service.connect()
-        
-        # Subscribe based on requested frequency
+        # Desired streams -> how to subscribe them; the 15m klines always stay on because
+        # they feed the trading strategy
+        symbol = "BTCUSDC"
+        interval = frequency.get("kline_interval", "1m")
+        desired = {
+            f"{symbol.lower()}@kline_15m": lambda: mexc_ws_service.subscribe_kline(symbol, "15m", handle_kline_update)
+        }
         if frequency.get("enable_ticker", True):
-            await mexc_ws_service.subscribe_ticker("BTCUSDT", handle_ticker_update)
-            
+            desired[f"{symbol.lower()}@ticker"] = lambda: mexc_ws_service.subscribe_ticker(symbol, handle_ticker_update)
         if frequency.get("enable_trades", True):
-            await mexc_ws_service.subscribe_trade("BTCUSDT", handle_trade_update)
-            
+            desired[f"{symbol.lower()}@trade"] = lambda: mexc_ws_service.subscribe_trade(symbol, handle_trade_update)
         if frequency.get("enable_klines", False):
-            interval = frequency.get("kline_interval", "1m")
-            await mexc_ws_service.subscribe_kline("BTCUSDT", interval, handle_kline_update)
+            desired[f"{symbol.lower()}@kline_{interval}"] = lambda: mexc_ws_service.subscribe_kline(symbol, interval, handle_kline_update)
+        
+        # Drop streams that are no longer wanted - even when the connection is gone, their callbacks
+        # would otherwise still be dispatched and polled in fallback mode
+        current = set(mexc_ws_service.callbacks)
+        for stream in current - desired.keys():
+            await mexc_ws_service.unsubscribe(stream)
+        
+        # Only reconnect if the upstream connection is gone (which also drops its subscriptions)
+        if not mexc_ws_service.is_connected:
+            await mexc_ws_service.connect()
+            current = set()
+        
+        for stream in desired.keys() - current:
+            await desired[stream]()
             
         return {
             "status": "Update frequency configured",
@@ -828,16 +1122,20 @@ async def set_update_frequency(frequency: dict):
             "info": {
                 "ticker_updates": "~100ms (real-time price changes)",
                 "trade_updates": "Immediate (every trade execution)",
-                "kline_updates": f"Every {frequency.get('kline_interval', '1m')} candle close"
+                "kline_updates": f"Every {interval} candle close"
             }
         }
-    except Exception as e:
-        logger.error(f"Error setting update frequency: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    except Exception:
+        raise_http("Failed to set update frequency")
 
 async def handle_kline_update(data):
     """Handle real-time kline updates from MEXC WebSocket"""
+    global _kline_flush_handle
     try:
+        # Only process closed klines - skip parsing the many in-progress updates
+        if not data['x']:  # True when kline is closed
+            return
+        
         # This gives us completed candle data
         kline_data = {
             "open_time": data['t'],
@@ -847,55 +1145,99 @@ async def handle_kline_update(data):
             "low": float(data['l']),
             "close": float(data['c']),
             "volume": float(data['v']),
-            "is_closed": data['x']  # True when kline is closed
+            "is_closed": True
         }
         
-        # Only process closed klines for analysis
-        if kline_data["is_closed"]:
-            # Broadcast kline update to all connected clients
-            for connection in active_connections:
-                try:
-                    await connection.send_json({
-                        "type": "kline_update",
-                        "data": kline_data
-                    })
-                except Exception as e:
-                    logger.error(f"Error sending kline update to client: {e}")
+        # Feed closed 15m candles to the strategy's kline ring
+        if data.get('i') == '15m' and (not _klines_ring or kline_data["open_time"] > _klines_ring[-1][0]):
+            _klines_ring.append([
+                kline_data["open_time"], kline_data["open"], kline_data["high"], kline_data["low"],
+                kline_data["close"], kline_data["volume"], kline_data["close_time"], float(data.get('q', 0))
+            ])
+        
+        # Coalesce bursts of closed candles into one broadcast
+        _kline_buf.append(kline_data)
+        if _kline_flush_handle is None:
+            _kline_flush_handle = asyncio.get_running_loop().call_later(_KLINE_COALESCE_WINDOW, _flush_klines)
                     
     except Exception as e:
         logger.error(f"Error handling kline update: {e}")
 
+def _flush_klines():
+    """Broadcast buffered closed klines - a single kline_update, or one kline_batch for a burst"""
+    global _kline_flush_handle
+    _kline_flush_handle = None
+    if not _kline_buf:
+        return
+    batch = _kline_buf[:]
+    _kline_buf.clear()
+    if len(batch) == 1:
+        broadcaster.publish({"type": "kline_update", "data": batch[0]})
+    else:
+        broadcaster.publish({"type": "kline_batch", "data": batch})
+
+# Static status fragments (the platform cannot change while the process runs)
+_PLATFORM = "Railway" if "RAILWAY_ENVIRONMENT" in os.environ else "Local"
+_ENV_WHITELIST = ("RAILWAY_ENVIRONMENT", "RAILWAY_PROJECT_ID", "PORT")
+_SERVER_ENVIRONMENT = (
+    {key: os.environ[key] for key in _ENV_WHITELIST if key in os.environ}
+    if "RAILWAY_ENVIRONMENT" in os.environ else "Local development"
+)
+_ENVIRONMENT_NAME = os.environ.get("RAILWAY_ENVIRONMENT") or "Local"
+_DEPLOYMENT_INFO = {
+    "platform": _PLATFORM,
+    "fallback_reason": None,
+    "performance_impact": None
+}
+_FALLBACK_DEPLOYMENT_INFO = {
+    "platform": _PLATFORM,
+    "fallback_reason": "MEXC WebSocket blocked by hosting provider",
+    "performance_impact": "Minimal - REST API provides same data with 1-2s delay"
+}
+_FALLBACK_RECOMMENDATIONS = {
+    "fallback_mode": "Using REST API polling - performance impact is minimal",
+    "data_frequency": "1-2 seconds instead of real-time WebSocket",
+    "trading_impact": "No impact on trading functionality"
+}
+
 @app.get("/api/websocket-status")
-async def get_websocket_status():
+async def get_websocket_status(request: Request):
     """Get WebSocket connection status and data frequency info"""
     status = mexc_ws_service.get_status()
-    status["deployment_info"] = {
-        "platform": "Railway" if "RAILWAY_ENVIRONMENT" in os.environ else "Local",
-        "fallback_reason": "MEXC WebSocket blocked by hosting provider" if status["fallback_mode"] else None,
-        "performance_impact": "Minimal - REST API provides same data with 1-2s delay" if status["fallback_mode"] else None
-    }
-    return status
+    status["deployment_info"] = _FALLBACK_DEPLOYMENT_INFO if status["fallback_mode"] else _DEPLOYMENT_INFO
+    return _polled_json(request, status)
+
+async def _exchange_symbols() -> List:
+    """MEXC symbol list, cached for _SYMBOLS_TTL seconds"""
+    global _symbols_cache
+    async with _symbols_lock:
+        if _symbols_cache and time.monotonic() - _symbols_cache[0] < _SYMBOLS_TTL:
+            return _symbols_cache[1]
+        mexc_service = trading_state.public_mexc  # Public data doesn't need auth
+        exchange_info = await _single_flight("exchange_info", mexc_service.get_exchange_info)
+        _symbols_cache = (time.monotonic(), exchange_info.get('symbols', []))
+        return _symbols_cache[1]
 
 @app.get("/api/mexc/symbols")
 async def get_mexc_symbols():
     """Get all trading symbols from MEXC"""
     try:
-        mexc_service = MexcService("", "")  # Public data doesn't need auth
-        exchange_info = mexc_service.get_exchange_info()
-        return {
-            "success": True,
-            "symbols": exchange_info.get('symbols', [])
-        }
-    except Exception as e:
-        logger.error(f"Error fetching MEXC symbols: {e}")
-        raise HTTPException(status_code=500, detail=f"Failed to fetch symbols: {str(e)}")
+        symbols = await _exchange_symbols()
+    except Exception:
+        raise_http("Failed to fetch symbols")
+    # Same {"success": true, "symbols": [...]} shape, streamed symbol by symbol
+    return StreamingResponse(_json_array_stream(symbols, b'{"success":true,"symbols":[', b']}'),
+                             media_type="application/json")
 
 @app.post("/api/mexc/account-balance")
 async def get_mexc_account_balance(credentials: TradingCredentials):
     """Get account balance from MEXC using provided API credentials"""
     try:
         mexc_service = MexcService(credentials.api_key, credentials.api_secret)
-        balance = mexc_service.get_account_balance()
+        balance = await asyncio.to_thread(mexc_service.get_account_balance)
+        
+        # Price every held asset up front (one batched request)
+        prices = await _asset_prices(_held_assets(balance))
         
         # Calculate total account value in USD
         total_usd_value = 0
@@ -908,23 +1250,8 @@ async def get_mexc_account_balance(credentials: TradingCredentials):
             total_asset = free + locked
             
             if total_asset > 0:
-                if asset == 'USDT':
-                    # USDT is already in USD
-                    usd_value = total_asset
-                else:
-                    # Get price for other assets in USDT
-                    try:
-                        if asset == 'BTC':
-                            btc_price = mexc_service.get_btc_price()
-                            usd_value = total_asset * btc_price
-                        else:
-                            # Try to get price for other assets
-                            price_response = mexc_service._make_request('GET', '/api/v3/ticker/price', {'symbol': f'{asset}USDT'})
-                            asset_price = float(price_response['price'])
-                            usd_value = total_asset * asset_price
-                    except:
-                        # If we can't get price, assume 0 value for now
-                        usd_value = 0
+                # If we can't get a price, assume 0 value for now
+                usd_value = _usd_value(asset, total_asset, prices)
                 
                 total_usd_value += usd_value
                 usd_balances.append({
@@ -945,9 +1272,8 @@ async def get_mexc_account_balance(credentials: TradingCredentials):
                 "crypto": total_usd_value - next((b['usd_value'] for b in usd_balances if b['asset'] == 'USDT'), 0)
             }
         }
-    except Exception as e:
-        logger.error(f"Error fetching MEXC account balance: {e}")
-        raise HTTPException(status_code=400, detail=f"Failed to fetch balance: {str(e)}")
+    except Exception:
+        raise_http("Failed to fetch balance - check your MEXC API credentials", status_code=400)
 
 @app.post("/api/mexc/test-connection")
 async def test_mexc_connection(credentials: TradingCredentials):
@@ -958,12 +1284,12 @@ async def test_mexc_connection(credentials: TradingCredentials):
         
         # Test basic price endpoint first
         logger.info("📊 Testing price endpoint...")
-        price = mexc_service.get_btc_price()
+        price = await asyncio.to_thread(mexc_service.get_btc_price)
         logger.info(f"✅ Price test successful: ${price}")
         
         # Try to get account info as a connection test
         logger.info("💰 Testing account balance endpoint...")
-        account_info = mexc_service.get_account_balance()
+        account_info = await asyncio.to_thread(mexc_service.get_account_balance)
         logger.info(f"✅ Account test successful: {account_info.get('accountType', 'SPOT')}")
         
         return {
@@ -989,95 +1315,71 @@ async def test_mexc_connection(credentials: TradingCredentials):
             }
         }
 
-@app.get("/api/connection-status")
-async def get_connection_status():
-    """Get detailed connection status for troubleshooting"""
-    try:
-        # Test MEXC REST API connectivity
-        mexc_service = MexcService("", "")
-        price = mexc_service.get_btc_price()
-        rest_api_working = True
-    except Exception as e:
-        price = None
-        rest_api_working = False
-        
-    return {
-        "rest_api": {
-            "working": rest_api_working,
+async def _rest_api_status() -> Dict:
+    """Test MEXC REST API connectivity, reusing the result for _REST_STATUS_TTL seconds"""
+    global _rest_status_cache
+    async with _rest_status_lock:
+        if _rest_status_cache and time.monotonic() - _rest_status_cache[0] < _REST_STATUS_TTL:
+            return _rest_status_cache[1]
+        try:
+            price = await _public_btc_price()
+            error = None
+        except Exception as e:
+            price = None
+            error = str(e)
+        status = {
+            "working": error is None,
             "last_price": price,
             "endpoint": "https://api.mexc.com/api/v3",
-            "error": str(e) if not rest_api_working else None
-        },
+            "error": error
+        }
+        _rest_status_cache = (time.monotonic(), status)
+        return status
+
+@app.get("/api/connection-status")
+async def get_connection_status(request: Request):
+    """Get detailed connection status for troubleshooting"""
+    return _polled_json(request, {
+        "rest_api": await _rest_api_status(),
         "websocket": mexc_ws_service.get_status(),
         "server_info": {
-            "platform": "Railway" if "RAILWAY_ENVIRONMENT" in os.environ else "Local",
-            "timestamp": datetime.now().isoformat(),
-            "environment": dict(os.environ) if "RAILWAY_ENVIRONMENT" in os.environ else "Local development"
+            "platform": _PLATFORM,
+            "environment": _SERVER_ENVIRONMENT
         },
-        "recommendations": {
-            "fallback_mode": "Using REST API polling - performance impact is minimal",
-            "data_frequency": "1-2 seconds instead of real-time WebSocket",
-            "trading_impact": "No impact on trading functionality"
-        } if mexc_ws_service.fallback_mode else None
-    }
+        "recommendations": _FALLBACK_RECOMMENDATIONS if mexc_ws_service.fallback_mode else None
+    }, extra_headers={"X-Server-Time": datetime.now().isoformat()})
 
 @app.get("/api/test-database")
 async def test_database_connection():
     """Test database connection endpoint for Railway debugging"""
-    import aiomysql
-    
-    database_url = os.environ.get('DATABASE_URL')
-    railway_env = os.environ.get('RAILWAY_ENVIRONMENT')
+    db_config = trading_state.database_service.config
     
     result = {
-        "environment": railway_env or "Local",
-        "database_url_configured": bool(database_url),
-        "database_url_format": database_url[:30] + "..." + database_url[-20:] if database_url and len(database_url) > 50 else database_url,
+        "environment": _ENVIRONMENT_NAME,
+        "database_url_configured": db_config is not None,
+        "database_url_format": db_config.masked_url if db_config else None,
         "connection_test": None,
         "error": None,
-        "timestamp": datetime.now().isoformat(),
-        "database_type": "MySQL/PlanetScale"
+        "timestamp": datetime.now(),
+        "database_type": "PostgreSQL"
     }
     
-    if not database_url:
+    if not db_config:
         result["error"] = "DATABASE_URL environment variable not set"
         result["connection_test"] = False
         return result
     
+    if not trading_state.database_service.pool:
+        result["error"] = "Database connection pool not initialized"
+        result["connection_test"] = False
+        return result
+    
     try:
-        # Parse MySQL URL for connection test
-        url_parts = database_url.replace('mysql://', '').split('/')
-        auth_host = url_parts[0]
-        database = url_parts[1].split('?')[0]
-        
-        auth, host_port = auth_host.split('@')
-        username, password = auth.split(':')
-        
-        if ':' in host_port:
-            host, port = host_port.split(':')
-            port = int(port)
-        else:
-            host = host_port
-            port = 3306
-        
-        # Test connection
-        conn = await aiomysql.connect(
-            host=host,
-            port=port,
-            user=username,
-            password=password,
-            db=database,
-            autocommit=True
-        )
-        
-        cursor = await conn.cursor()
-        await cursor.execute('SELECT VERSION()')
-        version = await cursor.fetchone()
-        await cursor.close()
-        conn.close()
+        # Reuse the application's connection pool instead of opening a new connection
+        version = await trading_state.database_service.get_server_version()
         
         result["connection_test"] = True
-        result["mysql_version"] = version[0][:50] + "..." if len(version[0]) > 50 else version[0]
+        result["server_version"] = version[:50] + "..." if len(version) > 50 else version
         
     except Exception as e:
         result["connection_test"] = False
@@ -1088,20 +1390,46 @@ async def test_database_connection():
 
 # Removed candle aggregation endpoints - using real-time WebSocket data
 
-@app.websocket("/ws")
-async def websocket_endpoint(websocket: WebSocket):
+async def _serve_client(websocket: WebSocket, fmt: str, send: Callable):
+    """Register a client on the broadcaster and hold the connection until it closes"""
     await websocket.accept()
-    active_connections.append(websocket)
+    broadcaster.add(websocket, fmt, send)
     try:
         while True:
-            # Keep connection alive and handle any incoming messages
-            data = await websocket.receive_text()
-            # Process any incoming messages if needed
+            # Inbound frames only keep the connection alive - no command verbs are
+            # defined yet, so frames are not decoded (no UTF-8 validation / json.loads)
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+    except WebSocketDisconnect:
+        pass
     except Exception as e:
         logger.error(f"WebSocket error: {e}")
     finally:
-        active_connections.remove(websocket)
+        # Always unregister and cancel the writer so no broadcast targets a dead socket
+        broadcaster.remove(websocket)
+
+@app.websocket("/ws")
+async def websocket_endpoint(websocket: WebSocket, encoding: str = "json", compression: Optional[str] = None):
+    """Market data stream - JSON text frames by default, binary MessagePack with ?encoding=msgpack
+    (add &compression=zstd for flag-prefixed zstd frames)"""
+    if encoding == "msgpack" and compression == "zstd":
+        await _serve_client(websocket, "zstd", websocket.send_bytes)
+    elif encoding == "msgpack":
+        await _serve_client(websocket, "msgpack", websocket.send_bytes)
+    else:
+        await _serve_client(websocket, "json", websocket.send_text)
+
+@app.websocket("/ws/ticks")
+async def ticks_websocket_endpoint(websocket: WebSocket):
+    """Binary price stream: one 16-byte frame per ticker flush, struct '<dd' (price, timestamp)"""
+    await _serve_client(websocket, "ticks", websocket.send_bytes)
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000) # Railway deployment trigger 2025-06-16T23:52:04 CEST
+    try:
+        import uvloop  # libuv-backed event loop (not available on Windows)
+        loop = "uvloop"
+    except ImportError:
+        loop = "asyncio"
+    uvicorn.run(app, host="0.0.0.0", port=8000, loop=loop, ws_per_message_deflate=False) # Railway deployment trigger 2025-06-16T23:52:04 CEST
@@ -1,16 +1,186 @@
 import numpy as np
-import pandas as pd
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List, NamedTuple, Tuple, Optional
 from datetime import datetime
 import logging
+from collections import deque
+from functools import lru_cache
+from dataclasses import dataclass, field
+from numpy.lib.stride_tricks import sliding_window_view
+from services.indicator_kernels import ema, rsi_last, rsi_series, bb_last, atr_last
 
 logger = logging.getLogger(__name__)
 
+@dataclass(slots=True)
+class IndicatorCtx:
+    """Per-analysis context: kline columns as contiguous float arrays (float64 unless asked otherwise),
+    extracted once, plus indicator values shared between helpers"""
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+    typical_price: Optional[np.ndarray] = None
+    results: Dict[tuple, float] = field(default_factory=dict)  # Keyed by (name, period)
+
+    def __post_init__(self):
+        if self.typical_price is None:
+            self.typical_price = (self.high + self.low + self.close) / 3
+
+    @classmethod
+    def from_klines(cls, klines, dtype=np.float64) -> 'IndicatorCtx':
+        """Parse klines (raw MEXC rows or a float64 array) in one cast - columns 0..5 are all numeric"""
+        arr = np.asarray(klines, dtype=np.float64)[:, :6]
+        timestamps = arr[:, 0]
+        if np.any(timestamps[1:] < timestamps[:-1]):
+            # The exchange returns bars oldest first - only reorder if a caller didn't
+            arr = arr[np.argsort(timestamps, kind='stable')]
+        # Column slices of a row-major array are strided - copy each once so the kernels get contiguous data
+        return cls(*(np.ascontiguousarray(arr[:, col], dtype=dtype) for col in range(1, 6)))
+
+class _DecisionInputs(NamedTuple):
+    indicators: Dict
+    support_resistance: Dict
+    patterns: Dict
+    market_structure: Dict
+    volume_analysis: Dict
+    current_price: float
+
+# AI decision rules, evaluated in order. Each rule reads one value and fires its first matching
+# branch: (predicate(value, inputs), bullish weight, bearish weight, reasoning template)
+_DECISION_RULES = (
+    # RSI Analysis
+    (lambda d: d.indicators.get('rsi', 50), (
+        (lambda v, d: v < 30, 2, 0, "RSI oversold at {v:.1f} - Strong buy signal"),
+        (lambda v, d: v > 70, 0, 2, "RSI overbought at {v:.1f} - Sell signal"),
+        (lambda v, d: 30 <= v <= 45, 1, 0, "RSI at {v:.1f} - Moderate bullish"),
+        (lambda v, d: 55 <= v <= 70, 0, 1, "RSI at {v:.1f} - Moderate bearish"),
+    )),
+    # MACD Analysis
+    (lambda d: d.indicators.get('macd', {}).get('histogram', 0), (
+        (lambda v, d: v > 0, 1, 0, "MACD histogram positive - Bullish momentum"),
+        (lambda v, d: True, 0, 1, "MACD histogram negative - Bearish momentum"),
+    )),
+    # Moving Average Analysis
+    (lambda d: (d.indicators.get('sma_20', d.current_price), d.indicators.get('sma_50', d.current_price)), (
+        (lambda v, d: d.current_price > v[0] > v[1], 2, 0, "Price above SMA20 > SMA50 - Strong uptrend"),
+        (lambda v, d: d.current_price < v[0] < v[1], 0, 2, "Price below SMA20 < SMA50 - Strong downtrend"),
+    )),
+    # Support/Resistance Analysis
+    (lambda d: d.support_resistance.get('distance_to_support'), (
+        (lambda v, d: v and v < 1, 2, 0, "Near support level - {v:.2f}% away"),
+    )),
+    (lambda d: d.support_resistance.get('distance_to_resistance'), (
+        (lambda v, d: v and v < 1, 0, 1, "Near resistance level - {v:.2f}% away"),
+    )),
+    # Market Structure Analysis
+    (lambda d: d.market_structure.get('trend_structure'), (
+        (lambda v, d: v == 'BULLISH', 1, 0, "Market structure is bullish"),
+        (lambda v, d: v == 'BEARISH', 0, 1, "Market structure is bearish"),
+    )),
+    # Volume Analysis
+    (lambda d: (d.volume_analysis.get('volume_bias'), d.volume_analysis.get('volume_trend')), (
+        (lambda v, d: v == ('BULLISH', 'INCREASING'), 1, 0, "Volume supports bullish bias"),
+        (lambda v, d: v == ('BEARISH', 'INCREASING'), 0, 1, "Volume supports bearish bias"),
+    )),
+    # Pattern Analysis
+    (lambda d: d.patterns.get('breakout_potential', {}).get('direction'), (
+        (lambda v, d: v == 'UP', 1, 0, "Potential upward breakout detected"),
+    )),
+    # Advanced Momentum Indicators
+    (lambda d: d.indicators.get('cci', 0), (
+        (lambda v, d: v < -100, 2, 0, "CCI oversold at {v:.1f} - Strong buy signal"),
+        (lambda v, d: v > 100, 0, 2, "CCI overbought at {v:.1f} - Strong sell signal"),
+    )),
+    (lambda d: d.indicators.get('roc', 0), (
+        (lambda v, d: v > 5, 1, 0, "Strong positive momentum - ROC: {v:.1f}%"),
+        (lambda v, d: v < -5, 0, 1, "Strong negative momentum - ROC: {v:.1f}%"),
+    )),
+    # Volatility Analysis
+    (lambda d: d.indicators.get('volatility', 0), (
+        (lambda v, d: v > 0.3, 0, 1, "High volatility detected - {v:.2f}"),  # High volatility
+    )),
+    # Trend Strength Analysis
+    (lambda d: d.indicators.get('adx', 0), (
+        (lambda v, d: v > 25 and d.current_price > d.indicators.get('sma_20', d.current_price), 1, 0,
+         "Strong uptrend confirmed - ADX: {v:.1f}"),
+        (lambda v, d: v > 25, 0, 1, "Strong downtrend confirmed - ADX: {v:.1f}"),
+    )),
+    (lambda d: d.indicators.get('aroon', {}).get('aroon_oscillator', 0), (
+        (lambda v, d: v > 50, 1, 0, "Aroon indicates uptrend - Oscillator: {v:.1f}"),
+        (lambda v, d: v < -50, 0, 1, "Aroon indicates downtrend - Oscillator: {v:.1f}"),
+    )),
+    # Volume-based Indicators
+    (lambda d: d.indicators.get('mfi', 50), (
+        (lambda v, d: v < 20, 2, 0, "MFI oversold at {v:.1f} - Strong buy signal"),
+        (lambda v, d: v > 80, 0, 2, "MFI overbought at {v:.1f} - Strong sell signal"),
+    )),
+    (lambda d: d.indicators.get('vwap', d.current_price), (
+        (lambda v, d: d.current_price > v * 1.01, 1, 0, "Price above VWAP - Bullish bias"),
+        (lambda v, d: d.current_price < v * 0.99, 0, 1, "Price below VWAP - Bearish bias"),
+    )),
+    # Pivot Points Analysis
+    (lambda d: d.indicators.get('pivot_points', {}), (
+        (lambda v, d: v and d.current_price > v.get('r1', d.current_price), 1, 0,
+         "Price above R1 resistance - Bullish breakout"),
+        (lambda v, d: v and d.current_price < v.get('s1', d.current_price), 0, 1,
+         "Price below S1 support - Bearish breakdown"),
+    )),
+    # Fibonacci Analysis - is price near key Fibonacci levels
+    (lambda d: d.indicators.get('fibonacci_levels', {}), (
+        (lambda v, d: v and abs(d.current_price - v.get('fib_61.8', d.current_price)) / d.current_price < 0.005, 1, 0,
+         "Price near 61.8% Fibonacci support"),
+        (lambda v, d: v and abs(d.current_price - v.get('fib_38.2', d.current_price)) / d.current_price < 0.005, 1, 0,
+         "Price near 38.2% Fibonacci support"),
+    )),
+    # Fear & Greed Index
+    (lambda d: d.indicators.get('fear_greed', 50), (
+        (lambda v, d: v < 25, 2, 0, "Extreme fear detected - F&G: {v:.1f} (Contrarian buy)"),
+        (lambda v, d: v > 75, 0, 1, "Extreme greed detected - F&G: {v:.1f} (Caution)"),
+    )),
+    # Bull/Bear Power Analysis
+    (lambda d: (d.indicators.get('bull_bear_power', {}).get('bull_power', 0),
+                d.indicators.get('bull_bear_power', {}).get('bear_power', 0)), (
+        (lambda v, d: v[0] > 0 and v[1] > 0, 2, 0, "Both bull and bear power positive - Strong bullish momentum"),
+        (lambda v, d: v[0] > abs(v[1]), 1, 0, "Bull power dominates - Bullish bias"),
+        (lambda v, d: abs(v[1]) > v[0], 0, 1, "Bear power dominates - Bearish bias"),
+        (lambda v, d: d.patterns.get('breakout_potential', {}).get('direction') == 'DOWN', 0, 1,
+         "Potential downward breakout detected"),
+    )),
+)
+
+# Pivot and Fibonacci levels depend only on a few session values that stay fixed between polls within a bar
+@lru_cache(maxsize=32)
+def _pivot_levels(prev_high: float, prev_low: float, prev_close: float) -> Dict:
+    pivot = (prev_high + prev_low + prev_close) / 3
+    return {
+        'pivot': pivot,
+        'r1': 2 * pivot - prev_low, 'r2': pivot + (prev_high - prev_low),
+        's1': 2 * pivot - prev_high, 's2': pivot - (prev_high - prev_low)
+    }
+
+@lru_cache(maxsize=32)
+def _fibonacci_levels(high: float, low: float) -> Dict:
+    diff = high - low
+    return {
+        'high': high,
+        'low': low,
+        'fib_23.6': high - 0.236 * diff,
+        'fib_38.2': high - 0.382 * diff,
+        'fib_50.0': high - 0.5 * diff,
+        'fib_61.8': high - 0.618 * diff,
+        'fib_78.6': high - 0.786 * diff
+    }
+
 class AITradingAnalysis:
-    def __init__(self):
-        self.analysis_history = []
+    def __init__(self, float32: bool = False):
+        # float32 halves the memory traffic of the indicator inputs; the kernels still accumulate in float64.
+        # Off by default - at BTC prices float32 steps are ~0.004, coarser than the exchange's 0.01 tick deltas
+        self.dtype = np.float32 if float32 else np.float64
+        self.analysis_history = deque(maxlen=100)  # Keep last 100 analyses
         self.support_levels = []
         self.resistance_levels = []
+        # Kline-derived stages by (bar count, last row) - repeated polls within a bar skip recomputation
+        self._kline_stage_cache: Dict[tuple, tuple] = {}
         
     def analyze_market(self, klines: List, current_price: float) -> Dict:
         """
@@ -20,25 +190,9 @@ class AITradingAnalysis:
             if len(klines) < 50:
                 return {"error": "Insufficient data for analysis"}
             
-            # Convert klines to DataFrame for easier analysis
-            df = self._klines_to_dataframe(klines)
-            
-            # Calculate all indicators
-            indicators = self._calculate_all_indicators(df)
+            indicators, support_resistance, patterns, market_structure, volume_analysis = self._analyze_klines(klines)
             
-            # Detect support and resistance levels
-            support_resistance = self._detect_support_resistance(df)
-            
-            # Pattern recognition
-            patterns = self._detect_patterns(df)
-            
-            # Market structure analysis
-            market_structure = self._analyze_market_structure(df)
-            
-            # Volume analysis
-            volume_analysis = self._analyze_volume(df)
-            
-            # AI decision making
+            # AI decision making (always re-run - current_price moves between polls)
             ai_decision = self._make_ai_decision(
                 indicators, support_resistance, patterns, 
                 market_structure, volume_analysis, current_price
@@ -61,8 +215,6 @@ class AITradingAnalysis:
             
             # Store analysis history
             self.analysis_history.append(analysis)
-            if len(self.analysis_history) > 100:  # Keep last 100 analyses
-                self.analysis_history.pop(0)
             
             return analysis
             
@@ -70,38 +222,47 @@ class AITradingAnalysis:
             logger.error(f"Error in AI analysis: {str(e)}")
             return {"error": str(e)}
     
-    def _klines_to_dataframe(self, klines: List) -> pd.DataFrame:
-        """Convert klines to pandas DataFrame"""
-        data = []
-        for kline in klines:
-            data.append({
-                'timestamp': kline[0],
-                'open': float(kline[1]),
-                'high': float(kline[2]),
-                'low': float(kline[3]),
-                'close': float(kline[4]),
-                'volume': float(kline[5])
-            })
-        
-        df = pd.DataFrame(data)
-        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-        return df.sort_values('timestamp').reset_index(drop=True)
-    
-    def _calculate_all_indicators(self, df: pd.DataFrame) -> Dict:
+    def _analyze_klines(self, klines) -> tuple:
+        """Indicators, S/R, patterns, market structure and volume analysis - cached per kline set"""
+        key = (len(klines), tuple(klines[-1][:6]))  # The in-progress bar's OHLCV changes the key too
+        cached = self._kline_stage_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        # Convert klines to plain arrays shared by every helper
+        k = IndicatorCtx.from_klines(klines, self.dtype)
+        
+        stages = (
+            self._calculate_all_indicators(k),   # Calculate all indicators
+            self._detect_support_resistance(k),  # Detect support and resistance levels
+            self._detect_patterns(k),            # Pattern recognition
+            self._analyze_market_structure(k),   # Market structure analysis
+            self._analyze_volume(k)              # Volume analysis
+        )
+        
+        if len(self._kline_stage_cache) >= 8:
+            del self._kline_stage_cache[next(iter(self._kline_stage_cache))]  # Evict the oldest entry
+        self._kline_stage_cache[key] = stages
+        return stages
+    
+    def _calculate_all_indicators(self, k: IndicatorCtx) -> Dict:
         """Calculate comprehensive technical indicators"""
         indicators = {}
+        close = k.close
         
         # Moving Averages
-        indicators['sma_20'] = df['close'].rolling(20).mean().iloc[-1]
-        indicators['sma_50'] = df['close'].rolling(50).mean().iloc[-1]
-        indicators['ema_12'] = df['close'].ewm(span=12).mean().iloc[-1]
-        indicators['ema_26'] = df['close'].ewm(span=26).mean().iloc[-1]
+        indicators['sma_20'] = close[-20:].mean()
+        indicators['sma_50'] = close[-50:].mean()
+        ema_12 = ema(close, 12)
+        ema_26 = ema(close, 26)
+        indicators['ema_12'] = ema_12[-1]
+        indicators['ema_26'] = ema_26[-1]
         
         # RSI
-        indicators['rsi'] = self._calculate_rsi(df['close'], 14)
+        indicators['rsi'] = self._calculate_rsi(k, 14)
         
-        # MACD
-        macd_line, signal_line, histogram = self._calculate_macd(df['close'])
+        # MACD (from the EMA series above)
+        macd_line, signal_line, histogram = self._calculate_macd(ema_12, ema_26)
         indicators['macd'] = {
             'macd_line': macd_line,
             'signal_line': signal_line,
@@ -109,63 +270,59 @@ class AITradingAnalysis:
         }
         
         # Bollinger Bands
-        bb_upper, bb_middle, bb_lower = self._calculate_bollinger_bands(df['close'], 20, 2)
+        bb_upper, bb_middle, bb_lower = self._calculate_bollinger_bands(close, 20, 2)
         indicators['bollinger'] = {
             'upper': bb_upper,
             'middle': bb_middle,
             'lower': bb_lower,
-            'position': self._get_bb_position(df['close'].iloc[-1], bb_upper, bb_lower)
+            'position': self._get_bb_position(close[-1], bb_upper, bb_lower)
         }
         
         # Stochastic
-        indicators['stochastic'] = self._calculate_stochastic(df, 14)
+        indicators['stochastic'] = self._calculate_stochastic(k, 14)
         
         # Williams %R
-        indicators['williams_r'] = self._calculate_williams_r(df, 14)
+        indicators['williams_r'] = self._calculate_williams_r(k, 14)
         
         # Volume indicators
-        indicators['volume_sma'] = df['volume'].rolling(20).mean().iloc[-1]
-        indicators['volume_ratio'] = df['volume'].iloc[-1] / indicators['volume_sma']
+        indicators['volume_sma'] = k.volume[-20:].mean()
+        indicators['volume_ratio'] = k.volume[-1] / indicators['volume_sma']
         
         # Advanced Momentum Indicators
-        indicators['cci'] = self._calculate_cci(df, 20)
-        indicators['roc'] = self._calculate_roc(df['close'], 12)
-        indicators['momentum'] = self._calculate_momentum(df['close'], 10)
+        indicators['cci'] = self._calculate_cci(k, 20)
+        indicators['roc'] = self._calculate_roc(close, 12)
+        indicators['momentum'] = self._calculate_momentum(close, 10)
         
         # Volatility Indicators
-        indicators['atr'] = self._calculate_atr(df, 14)
-        indicators['volatility'] = self._calculate_volatility(df['close'], 20)
+        indicators['atr'] = self._calculate_atr(k, 14)
+        indicators['volatility'] = self._calculate_volatility(close, 20)
         
         # Trend Strength Indicators
-        indicators['adx'] = self._calculate_adx(df, 14)
-        indicators['aroon'] = self._calculate_aroon(df, 14)
+        indicators['adx'] = self._calculate_adx(k, 14)
+        indicators['aroon'] = self._calculate_aroon(k, 14)
         
         # Volume-based Indicators
-        indicators['obv'] = self._calculate_obv(df)
-        indicators['mfi'] = self._calculate_mfi(df, 14)
-        indicators['vwap'] = self._calculate_vwap(df)
+        indicators['obv'] = self._calculate_obv(k)
+        indicators['mfi'] = self._calculate_mfi(k, 14)
+        indicators['vwap'] = self._calculate_vwap(k)
         
         # Price Action Indicators
-        indicators['pivot_points'] = self._calculate_pivot_points(df)
-        indicators['fibonacci_levels'] = self._calculate_fibonacci_retracements(df)
+        indicators['pivot_points'] = self._calculate_pivot_points(k)
+        indicators['fibonacci_levels'] = self._calculate_fibonacci_retracements(k)
         
         # Market Sentiment Indicators
-        indicators['fear_greed'] = self._calculate_fear_greed_index(df)
-        indicators['bull_bear_power'] = self._calculate_bull_bear_power(df)
+        indicators['fear_greed'] = self._calculate_fear_greed_index(k)
+        indicators['bull_bear_power'] = self._calculate_bull_bear_power(k)
         
         return indicators
     
-    def _detect_support_resistance(self, df: pd.DataFrame) -> Dict:
+    def _detect_support_resistance(self, k: IndicatorCtx) -> Dict:
         """Detect support and resistance levels using pivot points and price action"""
-        highs = df['high'].values
-        lows = df['low'].values
-        closes = df['close'].values
-        
         # Find pivot points
-        resistance_levels = self._find_resistance_levels(highs, closes)
-        support_levels = self._find_support_levels(lows, closes)
+        resistance_levels = self._find_resistance_levels(k.high)
+        support_levels = self._find_support_levels(k.low)
         
-        current_price = closes[-1]
+        current_price = k.close[-1]
         
         # Find nearest levels
         nearest_resistance = min([r for r in resistance_levels if r > current_price], default=None)
@@ -180,24 +337,24 @@ class AITradingAnalysis:
             "distance_to_support": (current_price - nearest_support) / current_price * 100 if nearest_support else None
         }
     
-    def _detect_patterns(self, df: pd.DataFrame) -> Dict:
+    def _detect_patterns(self, k: IndicatorCtx) -> Dict:
         """Detect chart patterns"""
         patterns = {
-            "trend": self._detect_trend(df),
-            "candlestick_patterns": self._detect_candlestick_patterns(df),
-            "breakout_potential": self._detect_breakout_potential(df),
-            "divergence": self._detect_divergence(df)
+            "trend": self._detect_trend(k),
+            "candlestick_patterns": self._detect_candlestick_patterns(k),
+            "breakout_potential": self._detect_breakout_potential(k),
+            "divergence": self._detect_divergence(k)
         }
         return patterns
     
-    def _analyze_market_structure(self, df: pd.DataFrame) -> Dict:
+    def _analyze_market_structure(self, k: IndicatorCtx) -> Dict:
         """Analyze market structure (higher highs, higher lows, etc.)"""
-        highs = df['high'].values[-20:]  # Last 20 periods
-        lows = df['low'].values[-20:]
+        highs = k.high[-20:]  # Last 20 periods
+        lows = k.low[-20:]
         
         # Detect market structure
-        higher_highs = sum(1 for i in range(1, len(highs)) if highs[i] > highs[i-1])
-        higher_lows = sum(1 for i in range(1, len(lows)) if lows[i] > lows[i-1])
+        higher_highs = np.count_nonzero(np.diff(highs) > 0)
+        higher_lows = np.count_nonzero(np.diff(lows) > 0)
         
         structure_score = (higher_highs + higher_lows) / (len(highs) - 1)
         
@@ -215,20 +372,20 @@ class AITradingAnalysis:
             "higher_lows_ratio": higher_lows / (len(lows) - 1)
         }
     
-    def _analyze_volume(self, df: pd.DataFrame) -> Dict:
+    def _analyze_volume(self, k: IndicatorCtx) -> Dict:
         """Analyze volume patterns"""
-        volume = df['volume'].values
-        price_change = df['close'].pct_change().values
+        volume = k.volume
+        price_change = k.close[-10:] / k.close[-11:-1] - 1  # Returns of the last 10 bars
         
         # Volume trend
-        volume_sma = np.convolve(volume, np.ones(10)/10, mode='valid')
-        volume_trend = "INCREASING" if volume_sma[-1] > volume_sma[-5] else "DECREASING"
+        # Current 10-bar volume average vs the one 4 bars back (only these two windows are needed)
+        volume_trend = "INCREASING" if volume[-10:].mean() > volume[-14:-4].mean() else "DECREASING"
         
         # Volume-price relationship
-        positive_volume = np.sum(volume[-10:][price_change[-10:] > 0])
-        negative_volume = np.sum(volume[-10:][price_change[-10:] < 0])
+        # Up-bar volume minus down-bar volume in one dot product (flat bars weigh 0)
+        net_volume = volume[-10:] @ np.sign(price_change)
         
-        volume_bias = "BULLISH" if positive_volume > negative_volume else "BEARISH"
+        volume_bias = "BULLISH" if net_volume > 0 else "BEARISH"
         
         return {
             "volume_trend": volume_trend,
@@ -247,187 +404,16 @@ class AITradingAnalysis:
         bearish_signals = 0
         reasoning = []
         
-        # RSI Analysis
-        rsi = indicators.get('rsi', 50)
-        if rsi < 30:
-            bullish_signals += 2
-            reasoning.append(f"RSI oversold at {rsi:.1f} - Strong buy signal")
-        elif rsi > 70:
-            bearish_signals += 2
-            reasoning.append(f"RSI overbought at {rsi:.1f} - Sell signal")
-        elif 30 <= rsi <= 45:
-            bullish_signals += 1
-            reasoning.append(f"RSI at {rsi:.1f} - Moderate bullish")
-        elif 55 <= rsi <= 70:
-            bearish_signals += 1
-            reasoning.append(f"RSI at {rsi:.1f} - Moderate bearish")
-        
-        # MACD Analysis
-        macd = indicators.get('macd', {})
-        if macd.get('histogram', 0) > 0:
-            bullish_signals += 1
-            reasoning.append("MACD histogram positive - Bullish momentum")
-        else:
-            bearish_signals += 1
-            reasoning.append("MACD histogram negative - Bearish momentum")
-        
-        # Moving Average Analysis
-        sma_20 = indicators.get('sma_20', current_price)
-        sma_50 = indicators.get('sma_50', current_price)
-        if current_price > sma_20 > sma_50:
-            bullish_signals += 2
-            reasoning.append("Price above SMA20 > SMA50 - Strong uptrend")
-        elif current_price < sma_20 < sma_50:
-            bearish_signals += 2
-            reasoning.append("Price below SMA20 < SMA50 - Strong downtrend")
-        
-        # Support/Resistance Analysis
-        distance_to_support = support_resistance.get('distance_to_support')
-        distance_to_resistance = support_resistance.get('distance_to_resistance')
-        
-        if distance_to_support and distance_to_support < 1:
-            bullish_signals += 2
-            reasoning.append(f"Near support level - {distance_to_support:.2f}% away")
-        
-        if distance_to_resistance and distance_to_resistance < 1:
-            bearish_signals += 1
-            reasoning.append(f"Near resistance level - {distance_to_resistance:.2f}% away")
-        
-        # Market Structure Analysis
-        if market_structure.get('trend_structure') == 'BULLISH':
-            bullish_signals += 1
-            reasoning.append("Market structure is bullish")
-        elif market_structure.get('trend_structure') == 'BEARISH':
-            bearish_signals += 1
-            reasoning.append("Market structure is bearish")
-        
-        # Volume Analysis
-        if volume_analysis.get('volume_bias') == 'BULLISH' and volume_analysis.get('volume_trend') == 'INCREASING':
-            bullish_signals += 1
-            reasoning.append("Volume supports bullish bias")
-        elif volume_analysis.get('volume_bias') == 'BEARISH' and volume_analysis.get('volume_trend') == 'INCREASING':
-            bearish_signals += 1
-            reasoning.append("Volume supports bearish bias")
-        
-        # Pattern Analysis
-        if patterns.get('breakout_potential', {}).get('direction') == 'UP':
-            bullish_signals += 1
-            reasoning.append("Potential upward breakout detected")
-        
-        # Advanced Momentum Indicators
-        cci = indicators.get('cci', 0)
-        if cci < -100:
-            bullish_signals += 2
-            reasoning.append(f"CCI oversold at {cci:.1f} - Strong buy signal")
-        elif cci > 100:
-            bearish_signals += 2
-            reasoning.append(f"CCI overbought at {cci:.1f} - Strong sell signal")
-        
-        roc = indicators.get('roc', 0)
-        if roc > 5:
-            bullish_signals += 1
-            reasoning.append(f"Strong positive momentum - ROC: {roc:.1f}%")
-        elif roc < -5:
-            bearish_signals += 1
-            reasoning.append(f"Strong negative momentum - ROC: {roc:.1f}%")
-        
-        # Volatility Analysis
-        atr = indicators.get('atr', 0)
-        volatility = indicators.get('volatility', 0)
-        if volatility > 0.3:  # High volatility
-            bearish_signals += 1
-            reasoning.append(f"High volatility detected - {volatility:.2f}")
-        
-        # Trend Strength Analysis
-        adx = indicators.get('adx', 0)
-        if adx > 25:
-            if current_price > indicators.get('sma_20', current_price):
-                bullish_signals += 1
-                reasoning.append(f"Strong uptrend confirmed - ADX: {adx:.1f}")
-            else:
-                bearish_signals += 1
-                reasoning.append(f"Strong downtrend confirmed - ADX: {adx:.1f}")
-        
-        aroon = indicators.get('aroon', {})
-        aroon_osc = aroon.get('aroon_oscillator', 0)
-        if aroon_osc > 50:
-            bullish_signals += 1
-            reasoning.append(f"Aroon indicates uptrend - Oscillator: {aroon_osc:.1f}")
-        elif aroon_osc < -50:
-            bearish_signals += 1
-            reasoning.append(f"Aroon indicates downtrend - Oscillator: {aroon_osc:.1f}")
-        
-        # Volume-based Indicators
-        mfi = indicators.get('mfi', 50)
-        if mfi < 20:
-            bullish_signals += 2
-            reasoning.append(f"MFI oversold at {mfi:.1f} - Strong buy signal")
-        elif mfi > 80:
-            bearish_signals += 2
-            reasoning.append(f"MFI overbought at {mfi:.1f} - Strong sell signal")
-        
-        vwap = indicators.get('vwap', current_price)
-        if current_price > vwap * 1.01:
-            bullish_signals += 1
-            reasoning.append(f"Price above VWAP - Bullish bias")
-        elif current_price < vwap * 0.99:
-            bearish_signals += 1
-            reasoning.append(f"Price below VWAP - Bearish bias")
-        
-        # Pivot Points Analysis
-        pivot_points = indicators.get('pivot_points', {})
-        if pivot_points:
-            pivot = pivot_points.get('pivot', current_price)
-            r1 = pivot_points.get('r1', current_price)
-            s1 = pivot_points.get('s1', current_price)
-            
-            if current_price > r1:
-                bullish_signals += 1
-                reasoning.append("Price above R1 resistance - Bullish breakout")
-            elif current_price < s1:
-                bearish_signals += 1
-                reasoning.append("Price below S1 support - Bearish breakdown")
-        
-        # Fibonacci Analysis
-        fib_levels = indicators.get('fibonacci_levels', {})
-        if fib_levels:
-            fib_618 = fib_levels.get('fib_61.8', current_price)
-            fib_382 = fib_levels.get('fib_38.2', current_price)
-            
-            # Check if price is near key Fibonacci levels
-            if abs(current_price - fib_618) / current_price < 0.005:
-                bullish_signals += 1
-                reasoning.append("Price near 61.8% Fibonacci support")
-            elif abs(current_price - fib_382) / current_price < 0.005:
-                bullish_signals += 1
-                reasoning.append("Price near 38.2% Fibonacci support")
-        
-        # Fear & Greed Index
-        fear_greed = indicators.get('fear_greed', 50)
-        if fear_greed < 25:
-            bullish_signals += 2
-            reasoning.append(f"Extreme fear detected - F&G: {fear_greed:.1f} (Contrarian buy)")
-        elif fear_greed > 75:
-            bearish_signals += 1
-            reasoning.append(f"Extreme greed detected - F&G: {fear_greed:.1f} (Caution)")
-        
-        # Bull/Bear Power Analysis
-        bull_bear = indicators.get('bull_bear_power', {})
-        bull_power = bull_bear.get('bull_power', 0)
-        bear_power = bull_bear.get('bear_power', 0)
-        
-        if bull_power > 0 and bear_power > 0:
-            bullish_signals += 2
-            reasoning.append("Both bull and bear power positive - Strong bullish momentum")
-        elif bull_power > abs(bear_power):
-            bullish_signals += 1
-            reasoning.append("Bull power dominates - Bullish bias")
-        elif abs(bear_power) > bull_power:
-            bearish_signals += 1
-            reasoning.append("Bear power dominates - Bearish bias")
-        elif patterns.get('breakout_potential', {}).get('direction') == 'DOWN':
-            bearish_signals += 1
-            reasoning.append("Potential downward breakout detected")
+        inputs = _DecisionInputs(indicators, support_resistance, patterns,
+                                 market_structure, volume_analysis, current_price)
+        for getter, branches in _DECISION_RULES:
+            value = getter(inputs)
+            for predicate, bullish, bearish, reason in branches:
+                if predicate(value, inputs):
+                    bullish_signals += bullish
+                    bearish_signals += bearish
+                    reasoning.append(reason.format(v=value))  # Only fired rules pay for formatting
+                    break
         
         # Calculate confidence and action
         total_signals = bullish_signals + bearish_signals
@@ -455,38 +441,23 @@ class AITradingAnalysis:
         }
     
     # Helper methods for indicator calculations
-    def _calculate_rsi(self, prices: pd.Series, period: int = 14) -> float:
-        delta = prices.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
-        return rsi.iloc[-1] if not pd.isna(rsi.iloc[-1]) else 50
-    
-    def _calculate_macd(self, prices: pd.Series, fast=12, slow=26, signal=9) -> Tuple[float, float, float]:
-        ema_fast = prices.ewm(span=fast).mean()
-        ema_slow = prices.ewm(span=slow).mean()
+    def _calculate_rsi(self, k: IndicatorCtx, period: int = 14) -> float:
+        key = ('rsi', period)
+        if key not in k.results:
+            rsi = rsi_last(k.close, period)
+            k.results[key] = rsi if rsi == rsi else 50  # NaN is the only value not equal to itself
+        return k.results[key]
+    
+    def _calculate_macd(self, ema_fast: np.ndarray, ema_slow: np.ndarray, signal=9) -> Tuple[float, float, float]:
         macd_line = ema_fast - ema_slow
-        signal_line = macd_line.ewm(span=signal).mean()
-        histogram = macd_line - signal_line
+        signal_line = ema(macd_line, signal)
         
-        return (
-            macd_line.iloc[-1] if not pd.isna(macd_line.iloc[-1]) else 0,
-            signal_line.iloc[-1] if not pd.isna(signal_line.iloc[-1]) else 0,
-            histogram.iloc[-1] if not pd.isna(histogram.iloc[-1]) else 0
-        )
+        return macd_line[-1], signal_line[-1], macd_line[-1] - signal_line[-1]
     
-    def _calculate_bollinger_bands(self, prices: pd.Series, period: int = 20, std_dev: int = 2) -> Tuple[float, float, float]:
-        sma = prices.rolling(period).mean()
-        std = prices.rolling(period).std()
-        upper = sma + (std * std_dev)
-        lower = sma - (std * std_dev)
-        
-        return (
-            upper.iloc[-1] if not pd.isna(upper.iloc[-1]) else prices.iloc[-1],
-            sma.iloc[-1] if not pd.isna(sma.iloc[-1]) else prices.iloc[-1],
-            lower.iloc[-1] if not pd.isna(lower.iloc[-1]) else prices.iloc[-1]
-        )
+    def _calculate_bollinger_bands(self, prices: np.ndarray, period: int = 20, std_dev: int = 2) -> Tuple[float, float, float]:
+        if len(prices) < period:
+            return prices[-1], prices[-1], prices[-1]
+        return bb_last(prices, period, std_dev)
     
     def _get_bb_position(self, price: float, upper: float, lower: float) -> str:
         if price > upper:
@@ -496,53 +467,48 @@ class AITradingAnalysis:
         else:
             return "WITHIN_BANDS"
     
-    def _calculate_stochastic(self, df: pd.DataFrame, period: int = 14) -> float:
-        low_min = df['low'].rolling(period).min()
-        high_max = df['high'].rolling(period).max()
-        k_percent = 100 * ((df['close'] - low_min) / (high_max - low_min))
-        return k_percent.iloc[-1] if not pd.isna(k_percent.iloc[-1]) else 50
-    
-    def _calculate_williams_r(self, df: pd.DataFrame, period: int = 14) -> float:
-        high_max = df['high'].rolling(period).max()
-        low_min = df['low'].rolling(period).min()
-        williams_r = -100 * ((high_max - df['close']) / (high_max - low_min))
-        return williams_r.iloc[-1] if not pd.isna(williams_r.iloc[-1]) else -50
-    
-    def _find_resistance_levels(self, highs: np.ndarray, closes: np.ndarray) -> List[float]:
+    def _calculate_stochastic(self, k: IndicatorCtx, period: int = 14) -> float:
+        low_min = k.low[-period:].min()
+        high_max = k.high[-period:].max()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            k_percent = 100 * ((k.close[-1] - low_min) / (high_max - low_min))
+        return k_percent if k_percent == k_percent else 50
+    
+    def _calculate_williams_r(self, k: IndicatorCtx, period: int = 14) -> float:
+        high_max = k.high[-period:].max()
+        low_min = k.low[-period:].min()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            williams_r = -100 * ((high_max - k.close[-1]) / (high_max - low_min))
+        return williams_r if williams_r == williams_r else -50
+    
+    def _pivots(self, x: np.ndarray, maxima: bool = True) -> np.ndarray:
+        """Indices of 5-bar pivots - bars above (or below) both neighbours on each side"""
+        op = np.greater if maxima else np.less
+        center = x[2:-2]
+        return np.flatnonzero(op(center, x[1:-3]) & op(center, x[3:-1]) & op(center, x[:-4]) & op(center, x[4:])) + 2
+    
+    def _find_resistance_levels(self, highs: np.ndarray) -> List[float]:
         """Find resistance levels using local maxima"""
-        resistance_levels = []
-        for i in range(2, len(highs) - 2):
-            if highs[i] > highs[i-1] and highs[i] > highs[i+1] and highs[i] > highs[i-2] and highs[i] > highs[i+2]:
-                resistance_levels.append(highs[i])
-        
-        # Remove levels too close to each other
-        resistance_levels = sorted(set(resistance_levels))
-        filtered_levels = []
-        for level in resistance_levels:
-            if not any(abs(level - existing) / existing < 0.005 for existing in filtered_levels):
-                filtered_levels.append(level)
-        
-        return sorted(filtered_levels)[-5:]  # Return top 5 resistance levels
+        levels = np.unique(highs[self._pivots(highs, maxima=True)])
+        return self._dedupe_levels(levels)[-5:]  # Return top 5 resistance levels
     
-    def _find_support_levels(self, lows: np.ndarray, closes: np.ndarray) -> List[float]:
+    def _find_support_levels(self, lows: np.ndarray) -> List[float]:
         """Find support levels using local minima"""
-        support_levels = []
-        for i in range(2, len(lows) - 2):
-            if lows[i] < lows[i-1] and lows[i] < lows[i+1] and lows[i] < lows[i-2] and lows[i] < lows[i+2]:
-                support_levels.append(lows[i])
-        
-        # Remove levels too close to each other
-        support_levels = sorted(set(support_levels))
+        levels = np.unique(lows[self._pivots(lows, maxima=False)])
+        return self._dedupe_levels(levels)[-5:]  # Return top 5 support levels
+    
+    def _dedupe_levels(self, levels: np.ndarray) -> List[float]:
+        """Keep sorted levels at least 0.5% above the last kept one"""
+        # Levels are ascending, so the last kept level is always the closest one below
         filtered_levels = []
-        for level in support_levels:
-            if not any(abs(level - existing) / existing < 0.005 for existing in filtered_levels):
+        for level in levels:
+            if not filtered_levels or (level - filtered_levels[-1]) / filtered_levels[-1] >= 0.005:
                 filtered_levels.append(level)
-        
-        return sorted(filtered_levels)[-5:]  # Return top 5 support levels
+        return filtered_levels
     
-    def _detect_trend(self, df: pd.DataFrame) -> str:
+    def _detect_trend(self, k: IndicatorCtx) -> str:
         """Detect overall trend"""
-        closes = df['close'].values[-20:]  # Last 20 periods
+        closes = k.close[-20:]  # Last 20 periods
         if len(closes) < 10:
             return "INSUFFICIENT_DATA"
         
@@ -557,41 +523,37 @@ class AITradingAnalysis:
         else:
             return "SIDEWAYS"
     
-    def _detect_candlestick_patterns(self, df: pd.DataFrame) -> List[str]:
+    def _detect_candlestick_patterns(self, k: IndicatorCtx) -> List[str]:
         """Detect basic candlestick patterns"""
         patterns = []
-        if len(df) < 3:
+        if len(k.close) < 3:
             return patterns
         
-        last_3 = df.tail(3)
-        
         # Doji pattern
-        for i, row in last_3.iterrows():
-            body_size = abs(row['close'] - row['open'])
-            wick_size = row['high'] - row['low']
-            if body_size < wick_size * 0.1:
-                patterns.append("DOJI")
-                break
+        body_sizes = np.abs(k.close[-3:] - k.open[-3:])
+        wick_sizes = k.high[-3:] - k.low[-3:]
+        if np.any(body_sizes < wick_sizes * 0.1):
+            patterns.append("DOJI")
         
         # Hammer/Hanging Man
-        last_candle = df.iloc[-1]
-        body_size = abs(last_candle['close'] - last_candle['open'])
-        lower_wick = min(last_candle['open'], last_candle['close']) - last_candle['low']
-        upper_wick = last_candle['high'] - max(last_candle['open'], last_candle['close'])
+        open_, high, low, close = k.open[-1], k.high[-1], k.low[-1], k.close[-1]
+        body_size = abs(close - open_)
+        lower_wick = min(open_, close) - low
+        upper_wick = high - max(open_, close)
         
         if lower_wick > body_size * 2 and upper_wick < body_size * 0.5:
             patterns.append("HAMMER")
         
         return patterns
     
-    def _detect_breakout_potential(self, df: pd.DataFrame) -> Dict:
+    def _detect_breakout_potential(self, k: IndicatorCtx) -> Dict:
         """Detect potential breakouts"""
-        if len(df) < 20:
+        if len(k.close) < 20:
             return {}
         
-        recent_highs = df['high'].tail(10).max()
-        recent_lows = df['low'].tail(10).min()
-        current_price = df['close'].iloc[-1]
+        recent_highs = k.high[-10:].max()
+        recent_lows = k.low[-10:].min()
+        current_price = k.close[-1]
         
         # Check if price is near recent highs or lows
         distance_to_high = (recent_highs - current_price) / current_price
@@ -604,22 +566,21 @@ class AITradingAnalysis:
         
         return {}
     
-    def _detect_divergence(self, df: pd.DataFrame) -> Dict:
+    def _detect_divergence(self, k: IndicatorCtx) -> Dict:
         """Detect price-RSI divergence"""
-        if len(df) < 30:
+        close = k.close
+        if len(close) < 30:
             return {}
         
-        # Calculate RSI for divergence detection
-        rsi_values = []
-        for i in range(14, len(df)):
-            rsi = self._calculate_rsi(df['close'].iloc[:i+1], 14)
-            rsi_values.append(rsi)
+        # RSI of every bar from index 14 on, in a single pass
+        rsi_values = rsi_series(close, 14)[14:]
+        rsi_values[np.isnan(rsi_values)] = 50
         
         if len(rsi_values) < 10:
             return {}
         
         # Simple divergence detection (last 10 periods)
-        price_trend = df['close'].tail(10).iloc[-1] - df['close'].tail(10).iloc[0]
+        price_trend = close[-1] - close[-10]
         rsi_trend = rsi_values[-1] - rsi_values[-10]
         
         if price_trend > 0 and rsi_trend < 0:
@@ -631,208 +592,169 @@ class AITradingAnalysis:
     
     def get_analysis_history(self) -> List[Dict]:
         """Get recent analysis history"""
-        return self.analysis_history[-20:]  # Last 20 analyses 
+        return list(self.analysis_history)[-20:]  # Last 20 analyses 
     
     # Advanced Indicator Calculations
-    def _calculate_cci(self, df: pd.DataFrame, period: int = 20) -> float:
+    def _calculate_cci(self, k: IndicatorCtx, period: int = 20) -> float:
         """Calculate Commodity Channel Index"""
-        typical_price = (df['high'] + df['low'] + df['close']) / 3
-        sma_tp = typical_price.rolling(period).mean()
-        mad = typical_price.rolling(period).apply(lambda x: np.mean(np.abs(x - x.mean())))
-        cci = (typical_price - sma_tp) / (0.015 * mad)
-        return cci.iloc[-1] if not pd.isna(cci.iloc[-1]) else 0
-    
-    def _calculate_roc(self, prices: pd.Series, period: int = 12) -> float:
+        if len(k.close) < period:
+            return 0
+        # Only the last value is used, so work on the last window alone
+        window = k.typical_price[-period:]
+        sma_tp = window.mean()
+        mad = np.abs(window - sma_tp).mean()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cci = (window[-1] - sma_tp) / (0.015 * mad)
+        return cci if cci == cci else 0
+    
+    def _calculate_roc(self, prices: np.ndarray, period: int = 12) -> float:
         """Calculate Rate of Change"""
-        roc = ((prices - prices.shift(period)) / prices.shift(period)) * 100
-        return roc.iloc[-1] if not pd.isna(roc.iloc[-1]) else 0
+        if len(prices) <= period:
+            return 0
+        roc = ((prices[-1] - prices[-1 - period]) / prices[-1 - period]) * 100
+        return roc if roc == roc else 0
     
-    def _calculate_momentum(self, prices: pd.Series, period: int = 10) -> float:
+    def _calculate_momentum(self, prices: np.ndarray, period: int = 10) -> float:
         """Calculate Momentum"""
-        momentum = prices - prices.shift(period)
-        return momentum.iloc[-1] if not pd.isna(momentum.iloc[-1]) else 0
+        if len(prices) <= period:
+            return 0
+        return prices[-1] - prices[-1 - period]
     
-    def _calculate_atr(self, df: pd.DataFrame, period: int = 14) -> float:
+    def _calculate_atr(self, k: IndicatorCtx, period: int = 14) -> float:
         """Calculate Average True Range"""
-        high_low = df['high'] - df['low']
-        high_close = np.abs(df['high'] - df['close'].shift())
-        low_close = np.abs(df['low'] - df['close'].shift())
-        true_range = np.maximum(high_low, np.maximum(high_close, low_close))
-        atr = pd.Series(true_range).rolling(period).mean()
-        return atr.iloc[-1] if not pd.isna(atr.iloc[-1]) else 0
-    
-    def _calculate_volatility(self, prices: pd.Series, period: int = 20) -> float:
+        atr = atr_last(k.high, k.low, k.close, period)
+        return atr if atr == atr else 0
+    
+    def _calculate_volatility(self, prices: np.ndarray, period: int = 20) -> float:
         """Calculate Price Volatility (Standard Deviation)"""
-        returns = prices.pct_change()
-        volatility = returns.rolling(period).std() * np.sqrt(252)  # Annualized
-        return volatility.iloc[-1] if not pd.isna(volatility.iloc[-1]) else 0
+        if len(prices) <= period:
+            return 0
+        returns = prices[-period:] / prices[-period - 1:-1] - 1
+        volatility = returns.std(ddof=1) * np.sqrt(252)  # Annualized
+        return volatility if volatility == volatility else 0
     
-    def _calculate_adx(self, df: pd.DataFrame, period: int = 14) -> float:
+    def _calculate_adx(self, k: IndicatorCtx, period: int = 14) -> float:
         """Calculate Average Directional Index"""
-        high_diff = df['high'].diff()
-        low_diff = df['low'].diff()
+        high_diff = np.diff(k.high, prepend=np.nan)
+        low_diff = np.diff(k.low, prepend=np.nan)
         
         plus_dm = np.where((high_diff > low_diff) & (high_diff > 0), high_diff, 0)
         minus_dm = np.where((low_diff > high_diff) & (low_diff > 0), low_diff, 0)
         
-        atr = self._calculate_atr(df, period)
+        atr = self._calculate_atr(k, period)
         if atr == 0:
             return 0
+        # The ADX averages the last `period` DX values, each from a `period`-bar DM average
+        if len(plus_dm) < 2 * period - 1:
+            return 0
             
-        plus_di = 100 * (pd.Series(plus_dm).rolling(period).mean() / atr)
-        minus_di = 100 * (pd.Series(minus_dm).rolling(period).mean() / atr)
+        plus_di = 100 * (sliding_window_view(plus_dm, period).mean(axis=1) / atr)
+        minus_di = 100 * (sliding_window_view(minus_dm, period).mean(axis=1) / atr)
         
-        dx = 100 * np.abs(plus_di - minus_di) / (plus_di + minus_di)
-        adx = dx.rolling(period).mean()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            dx = 100 * np.abs(plus_di - minus_di) / (plus_di + minus_di)
+        adx = dx[-period:].mean()
         
-        return adx.iloc[-1] if not pd.isna(adx.iloc[-1]) else 0
+        return adx if adx == adx else 0
     
-    def _calculate_aroon(self, df: pd.DataFrame, period: int = 14) -> Dict:
+    def _calculate_aroon(self, k: IndicatorCtx, period: int = 14) -> Dict:
         """Calculate Aroon Up and Aroon Down"""
-        if len(df) < period:
+        if len(k.close) <= period:
             return {'aroon_up': 50, 'aroon_down': 50, 'aroon_oscillator': 0}
-            
-        aroon_up = []
-        aroon_down = []
         
-        for i in range(period, len(df)):
-            high_period = df['high'].iloc[i-period:i+1]
-            low_period = df['low'].iloc[i-period:i+1]
-            
-            high_idx = high_period.idxmax()
-            low_idx = low_period.idxmin()
-            
-            periods_since_high = i - high_period.index.get_loc(high_idx)
-            periods_since_low = i - low_period.index.get_loc(low_idx)
-            
-            aroon_up.append(((period - periods_since_high) / period) * 100)
-            aroon_down.append(((period - periods_since_low) / period) * 100)
+        # Only the last value is reported, so only the last window is scanned:
+        # last bar index minus the offset of the window's extreme
+        last_bar = len(k.close) - 1
+        periods_since_high = last_bar - int(k.high[-period - 1:].argmax())
+        periods_since_low = last_bar - int(k.low[-period - 1:].argmin())
+        
+        aroon_up = ((period - periods_since_high) / period) * 100
+        aroon_down = ((period - periods_since_low) / period) * 100
         
         return {
-            'aroon_up': aroon_up[-1] if aroon_up else 50,
-            'aroon_down': aroon_down[-1] if aroon_down else 50,
-            'aroon_oscillator': (aroon_up[-1] - aroon_down[-1]) if aroon_up and aroon_down else 0
+            'aroon_up': aroon_up,
+            'aroon_down': aroon_down,
+            'aroon_oscillator': aroon_up - aroon_down
         }
     
-    def _calculate_obv(self, df: pd.DataFrame) -> float:
+    def _calculate_obv(self, k: IndicatorCtx) -> float:
         """Calculate On-Balance Volume"""
-        obv = [0]
-        for i in range(1, len(df)):
-            if df['close'].iloc[i] > df['close'].iloc[i-1]:
-                obv.append(obv[-1] + df['volume'].iloc[i])
-            elif df['close'].iloc[i] < df['close'].iloc[i-1]:
-                obv.append(obv[-1] - df['volume'].iloc[i])
-            else:
-                obv.append(obv[-1])
-        return obv[-1]
+        # Each bar's volume signed by its close-to-close direction (unchanged closes add 0)
+        return float(k.volume[1:] @ np.sign(np.diff(k.close)))
     
-    def _calculate_mfi(self, df: pd.DataFrame, period: int = 14) -> float:
+    def _calculate_mfi(self, k: IndicatorCtx, period: int = 14) -> float:
         """Calculate Money Flow Index"""
-        typical_price = (df['high'] + df['low'] + df['close']) / 3
-        money_flow = typical_price * df['volume']
-        
-        positive_flow = []
-        negative_flow = []
-        
-        for i in range(1, len(df)):
-            if typical_price.iloc[i] > typical_price.iloc[i-1]:
-                positive_flow.append(money_flow.iloc[i])
-                negative_flow.append(0)
-            elif typical_price.iloc[i] < typical_price.iloc[i-1]:
-                positive_flow.append(0)
-                negative_flow.append(money_flow.iloc[i])
-            else:
-                positive_flow.append(0)
-                negative_flow.append(0)
+        if len(k.close) <= period:
+            return 50
+        # Only the last value is reported: the last `period` bars plus the bar before them
+        typical_price = k.typical_price[-period - 1:]
+        money_flow = (typical_price * k.volume[-period - 1:])[1:]
+        direction = np.diff(typical_price)
         
-        positive_mf = pd.Series(positive_flow).rolling(period).sum()
-        negative_mf = pd.Series(negative_flow).rolling(period).sum()
+        positive_mf = money_flow[direction > 0].sum()
+        negative_mf = money_flow[direction < 0].sum()
         
         # Avoid division by zero
-        negative_mf = negative_mf.replace(0, 1)
-        mfi = 100 - (100 / (1 + (positive_mf / negative_mf)))
-        return mfi.iloc[-1] if not pd.isna(mfi.iloc[-1]) else 50
+        if negative_mf == 0:
+            negative_mf = 1
+        return 100 - (100 / (1 + (positive_mf / negative_mf)))
     
-    def _calculate_vwap(self, df: pd.DataFrame) -> float:
+    def _calculate_vwap(self, k: IndicatorCtx) -> float:
         """Calculate Volume Weighted Average Price"""
-        typical_price = (df['high'] + df['low'] + df['close']) / 3
-        vwap = (typical_price * df['volume']).cumsum() / df['volume'].cumsum()
-        return vwap.iloc[-1] if not pd.isna(vwap.iloc[-1]) else df['close'].iloc[-1]
+        typical_price = k.typical_price
+        with np.errstate(divide='ignore', invalid='ignore'):
+            vwap = np.dot(typical_price, k.volume) / k.volume.sum()
+        return vwap if vwap == vwap else k.close[-1]
     
-    def _calculate_pivot_points(self, df: pd.DataFrame) -> Dict:
+    def _calculate_pivot_points(self, k: IndicatorCtx) -> Dict:
         """Calculate Pivot Points"""
-        if len(df) < 2:
+        if len(k.close) < 2:
             return {}
         
-        prev_high = df['high'].iloc[-2]
-        prev_low = df['low'].iloc[-2]
-        prev_close = df['close'].iloc[-2]
-        
-        pivot = (prev_high + prev_low + prev_close) / 3
-        r1 = 2 * pivot - prev_low
-        s1 = 2 * pivot - prev_high
-        r2 = pivot + (prev_high - prev_low)
-        s2 = pivot - (prev_high - prev_low)
-        
-        return {
-            'pivot': pivot,
-            'r1': r1, 'r2': r2,
-            's1': s1, 's2': s2
-        }
+        # Copy, so callers can't modify the cached levels
+        return dict(_pivot_levels(float(k.high[-2]), float(k.low[-2]), float(k.close[-2])))
     
-    def _calculate_fibonacci_retracements(self, df: pd.DataFrame) -> Dict:
+    def _calculate_fibonacci_retracements(self, k: IndicatorCtx) -> Dict:
         """Calculate Fibonacci Retracement Levels"""
-        if len(df) < 20:
+        if len(k.close) < 20:
             return {}
         
-        recent_data = df.tail(20)
-        high = recent_data['high'].max()
-        low = recent_data['low'].min()
-        diff = high - low
-        
-        return {
-            'high': high,
-            'low': low,
-            'fib_23.6': high - 0.236 * diff,
-            'fib_38.2': high - 0.382 * diff,
-            'fib_50.0': high - 0.5 * diff,
-            'fib_61.8': high - 0.618 * diff,
-            'fib_78.6': high - 0.786 * diff
-        }
+        return dict(_fibonacci_levels(float(k.high[-20:].max()), float(k.low[-20:].min())))
     
-    def _calculate_fear_greed_index(self, df: pd.DataFrame) -> float:
+    def _calculate_fear_greed_index(self, k: IndicatorCtx) -> float:
         """Calculate a simplified Fear & Greed Index based on price action"""
-        if len(df) < 20:
+        close = k.close
+        if len(close) < 20:
             return 50
         
         # Price momentum (25% weight)
-        price_change = (df['close'].iloc[-1] - df['close'].iloc[-10]) / df['close'].iloc[-10]
+        price_change = (close[-1] - close[-10]) / close[-10]
         momentum_score = min(max((price_change * 100 + 50), 0), 100)
         
         # Volatility (25% weight)
-        volatility = df['close'].pct_change().tail(10).std()
+        volatility = (close[-10:] / close[-11:-1] - 1).std(ddof=1)
         volatility_score = min(max(100 - (volatility * 1000), 0), 100)
         
         # Volume (25% weight)
-        avg_volume = df['volume'].tail(20).mean()
-        current_volume = df['volume'].iloc[-1]
+        avg_volume = k.volume[-20:].mean()
+        current_volume = k.volume[-1]
         volume_score = min(max((current_volume / avg_volume) * 50, 0), 100)
         
         # RSI (25% weight)
-        rsi = self._calculate_rsi(df['close'], 14)
+        rsi = self._calculate_rsi(k, 14)  # Already computed for the indicators
         rsi_score = rsi
         
         fear_greed = (momentum_score + volatility_score + volume_score + rsi_score) / 4
         return fear_greed
     
-    def _calculate_bull_bear_power(self, df: pd.DataFrame) -> Dict:
+    def _calculate_bull_bear_power(self, k: IndicatorCtx) -> Dict:
         """Calculate Bull and Bear Power"""
-        ema_13 = df['close'].ewm(span=13).mean()
-        bull_power = df['high'] - ema_13
-        bear_power = df['low'] - ema_13
+        ema_13 = ema(k.close, 13)[-1]
+        bull_power = k.high[-1] - ema_13
+        bear_power = k.low[-1] - ema_13
         
         return {
-            'bull_power': bull_power.iloc[-1] if not pd.isna(bull_power.iloc[-1]) else 0,
-            'bear_power': bear_power.iloc[-1] if not pd.isna(bear_power.iloc[-1]) else 0,
-            'power_balance': (bull_power.iloc[-1] + bear_power.iloc[-1]) if not pd.isna(bull_power.iloc[-1]) and not pd.isna(bear_power.iloc[-1]) else 0
+            'bull_power': bull_power,
+            'bear_power': bear_power,
+            'power_balance': bull_power + bear_power
         }
\ No newline at end of file
@@ -1,17 +1,63 @@
 import asyncio
 import asyncpg
-import json
+import orjson
 import logging
-from datetime import datetime
+from datetime import datetime, timezone
+from dataclasses import dataclass
+from urllib.parse import urlsplit, unquote
 from typing import List, Dict, Optional
 import os
 
 logger = logging.getLogger(__name__)
 
+# Buffered system log rows are written with one COPY once this many are queued, or after the delay;
+# rows from a failed COPY are requeued, up to _MAX_BUFFERED
+_BATCH_SIZE = 100
+_BATCH_DELAY = 1.0
+_MAX_BUFFERED = 10 * _BATCH_SIZE
+
+_LOG_COLUMNS = ['timestamp', 'level', 'service', 'message', 'metadata']
+
+def _to_json(obj) -> Optional[str]:
+    """Encode a JSONB parameter with orjson (handles NumPy values in indicator payloads)"""
+    return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY).decode() if obj else None
+
+@dataclass(frozen=True)
+class DbConfig:
+    """Non-secret parts of DATABASE_URL, parsed once"""
+    scheme: str
+    host: Optional[str]
+    port: int
+    user: Optional[str]
+    database: str
+
+    @classmethod
+    def from_url(cls, url: str) -> 'DbConfig':
+        parts = urlsplit(url)
+        return cls(
+            scheme=parts.scheme,
+            host=parts.hostname,
+            port=parts.port or 5432,
+            user=unquote(parts.username) if parts.username else None,
+            database=parts.path.lstrip('/')
+        )
+
+    @property
+    def masked_url(self) -> str:
+        """Connection URL with the password masked, safe for logs and status endpoints"""
+        host = f"[{self.host}]" if self.host and ':' in self.host else self.host
+        return f"{self.scheme}://{self.user or ''}:***@{host}:{self.port}/{self.database}"
+
 class DatabaseService:
     def __init__(self):
         self.database_url = os.environ.get('DATABASE_URL')
+        self.config = DbConfig.from_url(self.database_url) if self.database_url else None
         self.pool = None
+        # Rows waiting for the next batched COPY (timestamped when queued, not when written)
+        self._log_buf: List[tuple] = []
+        self._buf_lock = asyncio.Lock()
+        self._flush_timer: Optional[asyncio.Task] = None
+        self._flush_tasks = set()
         
     async def connect(self):
         """Connect to PostgreSQL database"""
@@ -20,7 +66,7 @@ class DatabaseService:
                 logger.warning("DATABASE_URL not set - database features disabled")
                 return False
             
-            logger.info(f"Attempting to connect to database: {self.database_url[:50]}...")
+            logger.info(f"Attempting to connect to database: {self.config.masked_url}")
             
             self.pool = await asyncpg.create_pool(
                 self.database_url,
@@ -41,15 +87,72 @@ class DatabaseService:
             
         except Exception as e:
             logger.error(f"Failed to connect to database: {e}")
-            logger.error(f"Database URL format: {self.database_url[:30]}...")
+            logger.error(f"Database URL format: {self.config.masked_url if self.config else None}")
             return False
     
     async def disconnect(self):
         """Disconnect from database"""
         if self.pool:
+            if self._flush_timer:
+                self._flush_timer.cancel()
+            await self.flush()
             await self.pool.close()
             logger.info("Disconnected from database")
     
+    def _queue_log(self, row: tuple):
+        """Queue a system log row and schedule a flush - immediately when the batch fills, otherwise after _BATCH_DELAY"""
+        self._log_buf.append(row)
+        # Only the append that fills the batch flushes at once, so requeued rows are retried on the timer
+        if len(self._log_buf) == _BATCH_SIZE:
+            task = asyncio.create_task(self.flush())
+            self._flush_tasks.add(task)
+            task.add_done_callback(self._flush_tasks.discard)
+        elif self._flush_timer is None:
+            self._flush_timer = asyncio.create_task(self._flush_later())
+    
+    async def _flush_later(self):
+        """Timer task behind _queue_log's delayed flush"""
+        try:
+            await asyncio.sleep(_BATCH_DELAY)
+        finally:
+            self._flush_timer = None
+        await self.flush()
+    
+    async def flush(self):
+        """Write all buffered system log rows with one COPY"""
+        if not self.pool:
+            return False
+            
+        async with self._buf_lock:
+            logs, self._log_buf = self._log_buf, []
+            if not logs:
+                return True
+                
+            try:
+                async with self.pool.acquire() as conn:
+                    await conn.copy_records_to_table('system_logs', records=logs, columns=_LOG_COLUMNS)
+                    
+                return True
+                
+            except Exception as e:
+                # Put the rows back in front of anything queued meanwhile, keeping the newest on overflow
+                self._log_buf = logs + self._log_buf
+                dropped = len(self._log_buf) - _MAX_BUFFERED
+                if dropped > 0:
+                    del self._log_buf[:dropped]
+                    logger.error(f"Failed to flush {len(logs)} system events, dropped {dropped} oldest: {e}")
+                else:
+                    logger.error(f"Failed to flush {len(logs)} system events, requeued: {e}")
+                return False
+    
+    async def get_server_version(self) -> Optional[str]:
+        """Get the database server version using a pooled connection"""
+        if not self.pool:
+            return None
+            
+        async with self.pool.acquire() as conn:
+            return await conn.fetchval('SELECT version()')
+    
     async def _create_tables(self):
         """Create necessary tables"""
         async with self.pool.acquire() as conn:
@@ -136,7 +239,7 @@ class DatabaseService:
                     INSERT INTO trading_history 
                     (action, price, quantity, total_value, balance_before, balance_after, order_id, metadata)
                     VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
-                ''', action, price, quantity, price * quantity, balance_before, balance_after, order_id, json.dumps(metadata) if metadata else None)
+                ''', action, price, quantity, price * quantity, balance_before, balance_after, order_id, _to_json(metadata))
                 
             logger.info(f"Logged trade: {action} {quantity} BTC at ${price}")
             return True
@@ -164,6 +267,25 @@ class DatabaseService:
             logger.error(f"Failed to log price: {e}")
             return False
     
+    async def log_prices_bulk(self, rows: List[tuple]):
+        """Log a batch of (timestamp, price) rows with a single COPY"""
+        if not self.pool or not rows:
+            return False
+            
+        try:
+            async with self.pool.acquire() as conn:
+                await conn.copy_records_to_table(
+                    'price_history',
+                    records=rows,
+                    columns=['timestamp', 'price']
+                )
+                
+            return True
+            
+        except Exception as e:
+            logger.error(f"Failed to log prices: {e}")
+            return False
+    
     async def log_ai_analysis(self, current_price: float, recommendation: str, 
                              confidence: float, reasoning: str = None,
                              technical_indicators: dict = None, metadata: dict = None):
@@ -178,8 +300,8 @@ class DatabaseService:
                     (current_price, recommendation, confidence, reasoning, technical_indicators, metadata)
                     VALUES ($1, $2, $3, $4, $5, $6)
                 ''', current_price, recommendation, confidence, reasoning, 
-                json.dumps(technical_indicators) if technical_indicators else None,
-                json.dumps(metadata) if metadata else None)
+                _to_json(technical_indicators),
+                _to_json(metadata))
                 
             logger.info(f"Logged AI analysis: {recommendation} ({confidence}% confidence)")
             return True
@@ -189,22 +311,12 @@ class DatabaseService:
             return False
     
     async def log_system_event(self, level: str, service: str, message: str, metadata: dict = None):
-        """Log system events"""
+        """Queue a system event for the next batched write"""
         if not self.pool:
             return False
             
-        try:
-            async with self.pool.acquire() as conn:
-                await conn.execute('''
-                    INSERT INTO system_logs (level, service, message, metadata)
-                    VALUES ($1, $2, $3, $4)
-                ''', level, service, message, json.dumps(metadata) if metadata else None)
-                
-            return True
-            
-        except Exception as e:
-            logger.error(f"Failed to log system event: {e}")
-            return False
+        self._queue_log((datetime.now(timezone.utc), level, service, message, _to_json(metadata)))
+        return True
     
     async def get_trading_history(self, limit: int = 100, offset: int = 0) -> List[Dict]:
         """Get trading history"""
@@ -343,5 +455,43 @@ class DatabaseService:
             logger.error(f"Failed to get trading stats: {e}")
             return {'database_connected': False, 'error': str(e)}
 
+    async def get_performance_snapshot(self):
+        """Get 24h / 1 week balance windows plus the first and latest trade balances in one query"""
+        if not self.pool:
+            return None
+            
+        async with self.pool.acquire() as conn:
+            return await conn.fetchrow('''
+                WITH windows AS (
+                    SELECT 
+                        MIN(balance_after) FILTER (WHERE timestamp > NOW() - INTERVAL '24 hours') as min_balance_24h,
+                        MAX(balance_after) FILTER (WHERE timestamp > NOW() - INTERVAL '24 hours') as max_balance_24h,
+                        COUNT(*) FILTER (WHERE timestamp > NOW() - INTERVAL '24 hours') as trades_24h,
+                        MIN(balance_after) as min_balance_1w,
+                        MAX(balance_after) as max_balance_1w,
+                        COUNT(*) as trades_1w
+                    FROM trading_history 
+                    WHERE timestamp > NOW() - INTERVAL '1 week'
+                      AND balance_after IS NOT NULL
+                ),
+                first_trade AS (
+                    SELECT balance_before, timestamp as start_time
+                    FROM trading_history 
+                    WHERE balance_before IS NOT NULL
+                    ORDER BY timestamp ASC 
+                    LIMIT 1
+                ),
+                latest_trade AS (
+                    SELECT balance_after, timestamp as latest_time
+                    FROM trading_history 
+                    WHERE balance_after IS NOT NULL
+                    ORDER BY timestamp DESC 
+                    LIMIT 1
+                )
+                SELECT * FROM windows
+                LEFT JOIN first_trade ON TRUE
+                LEFT JOIN latest_trade ON TRUE
+            ''')
+
 # Global database service instance
 db_service = DatabaseService() 
\ No newline at end of file
@@ -0,0 +1,115 @@
+"""Single-pass indicator kernels over float64 arrays, JIT-compiled when numba is available"""
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional - the kernels still work as plain Python loops
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda fn: fn
+
+
+@njit(cache=True)
+def ema(values, span):
+    """Exponential moving average series (matches pandas ewm(span=span, adjust=True).mean())"""
+    decay = 1.0 - 2.0 / (span + 1.0)
+    out = np.empty(values.shape[0])
+    num = 0.0
+    den = 0.0
+    for i in range(values.shape[0]):
+        num = values[i] + decay * num
+        den = 1.0 + decay * den
+        out[i] = num / den
+    return out
+
+
+@njit(cache=True)
+def rsi_last(close, period):
+    """RSI of the last bar from simple averages of the last `period` gains and losses (NaN if undefined)"""
+    n = close.shape[0]
+    if n <= period:
+        return np.nan
+    gain = 0.0
+    loss = 0.0
+    for i in range(n - period, n):
+        delta = close[i] - close[i - 1]
+        if delta > 0:
+            gain += delta
+        elif delta < 0:
+            loss -= delta
+    if loss == 0.0:
+        return 100.0 if gain > 0.0 else np.nan
+    return 100.0 - 100.0 / (1.0 + gain / loss)
+
+
+@njit(cache=True)
+def rsi_series(close, period):
+    """RSI of every bar in one pass (NaN where undefined) - element i equals rsi_last(close[:i + 1], period)"""
+    n = close.shape[0]
+    out = np.full(n, np.nan)
+    gain = 0.0
+    loss = 0.0
+    gains = 0  # Non-zero terms in the window, so an all-flat window sums to exactly 0
+    losses = 0
+    for i in range(1, n):
+        delta = close[i] - close[i - 1]
+        if delta > 0:
+            gain += delta
+            gains += 1
+        elif delta < 0:
+            loss -= delta
+            losses += 1
+        if i > period:
+            # Slide the window: drop the delta that just left it
+            old = close[i - period] - close[i - period - 1]
+            if old > 0:
+                gain -= old
+                gains -= 1
+            elif old < 0:
+                loss += old
+                losses -= 1
+        if i >= period:
+            g = gain if gains else 0.0
+            l = loss if losses else 0.0
+            if l == 0.0:
+                out[i] = 100.0 if g > 0.0 else np.nan
+            else:
+                out[i] = 100.0 - 100.0 / (1.0 + g / l)
+    return out
+
+
+@njit(cache=True)
+def bb_last(close, period, k):
+    """Bollinger bands (upper, middle, lower) of the last window, using the sample std"""
+    start = close.shape[0] - period
+    mean = 0.0
+    for i in range(start, close.shape[0]):
+        mean += close[i]
+    mean /= period
+    var = 0.0
+    for i in range(start, close.shape[0]):
+        var += (close[i] - mean) ** 2
+    std = np.sqrt(var / (period - 1))
+    return mean + k * std, mean, mean - k * std
+
+
+@njit(cache=True)
+def atr_last(high, low, close, period):
+    """Average True Range of the last `period` bars (NaN if there aren't enough bars)"""
+    n = close.shape[0]
+    if n <= period:
+        return np.nan
+    total = 0.0
+    for i in range(n - period, n):
+        total += max(high[i] - low[i], abs(high[i] - close[i - 1]), abs(low[i] - close[i - 1]))
+    return total / period
+
+
+# Compile (or load the cached machine code) at import so the first analysis doesn't pay for it
+_warmup = np.linspace(1.0, 2.0, 32)
+ema(_warmup, 12)
+rsi_last(_warmup, 14)
+rsi_series(_warmup, 14)
+bb_last(_warmup, 20, 2.0)
+atr_last(_warmup, _warmup, _warmup, 14)
@@ -2,10 +2,12 @@ import hmac
 import hashlib
 import time
 import requests
+from requests.adapters import HTTPAdapter
 from typing import Dict, Optional, List
 import json
 from datetime import datetime
 import urllib.parse
+import numpy as np
 
 class MexcService:
     def __init__(self, api_key: str, api_secret: str):
@@ -13,6 +15,14 @@ class MexcService:
         self.api_secret = api_secret
         self.base_url = "https://api.mexc.com"
         self.ws_base_url = "wss://wbs.mexc.com/ws"
+        # Persistent session so TCP/TLS connections are reused across requests; the pool is sized
+        # for the concurrent to_thread calls made by the shared public instance
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=16))
+
+    def close(self):
+        """Close the underlying HTTP session"""
+        self.session.close()
         
     def _generate_signature(self, params: Dict) -> str:
         """Generate signature for authenticated requests"""
@@ -38,13 +48,13 @@ class MexcService:
 
         try:
             if method == 'GET':
-                response = requests.get(url, params=params, headers=headers)
+                response = self.session.get(url, params=params, headers=headers)
             elif method == 'POST':
                 # For POST requests (like orders), send as form data, not JSON
                 headers['Content-Type'] = 'application/x-www-form-urlencoded'
-                response = requests.post(url, data=params, headers=headers)
+                response = self.session.post(url, data=params, headers=headers)
             elif method == 'DELETE':
-                response = requests.delete(url, params=params, headers=headers)
+                response = self.session.delete(url, params=params, headers=headers)
             else:
                 raise ValueError(f"Unsupported method: {method}")
 
@@ -67,6 +77,17 @@ class MexcService:
         response = self._make_request('GET', endpoint, params)
         return float(response['price'])
 
+    def get_price(self, symbol: str) -> float:
+        """Get current price of a single symbol"""
+        endpoint = "/api/v3/ticker/price"
+        response = self._make_request('GET', endpoint, {'symbol': symbol})
+        return float(response['price'])
+
+    def get_all_prices(self) -> Dict[str, float]:
+        """Get the latest price of every symbol in a single request"""
+        endpoint = "/api/v3/ticker/price"
+        return {ticker['symbol']: float(ticker['price']) for ticker in self._make_request('GET', endpoint)}
+
     def get_account_balance(self) -> Dict:
         """Get account balance"""
         endpoint = "/api/v3/account"
@@ -124,6 +145,13 @@ class MexcService:
         }
         return self._make_request('GET', endpoint, params)
 
+    def get_klines_array(self, interval: str = '1m', limit: int = 100) -> np.ndarray:
+        """
+        Get kline data parsed once into a float64 array
+        Columns: open_time, open, high, low, close, volume, close_time, quote_volume
+        """
+        return np.asarray(self.get_klines(interval=interval, limit=limit), dtype=np.float64).reshape(-1, 8)
+
     def get_open_orders(self) -> List:
         """Get all open orders"""
         endpoint = "/api/v3/openOrders"